@@ -1,12 +1,49 @@
 from .const import DOMAIN
+from .coordinator import SfdbCoordinator
+from .openmeteo import ResponseCache
+from .persist import ModelStore
+from .view import SfdbForecastView
 
 async def async_setup_entry(hass, entry):
     """Set up solar_forecast_db from a Config Entry (UI)."""
+    coordinator = SfdbCoordinator(hass, entry)
+    # Letzten Stand sofort wiederherstellen (geprüft wird später), sonst erster Durchlauf
+    restored = await coordinator.async_restore()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+
+    # Neu rechnen nur bei Änderungen der Upstream-Sensoren
+    coordinator.async_start()
+    entry.async_on_unload(coordinator.async_stop)
+    if restored:
+        coordinator.async_revalidate()
+
+    # HTTP-View nur einmal registrieren (gilt für alle Entries)
+    if not hass.data.get(f"{DOMAIN}_view"):
+        hass.http.register_view(SfdbForecastView())
+        hass.data[f"{DOMAIN}_view"] = True
+
+    # Geänderte Options (z.B. Stunden-Sensoren an/aus) => Entry neu laden
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     hass.async_create_task(
         hass.config_entries.async_forward_entry_setup(entry, "sensor")
     )
     return True
 
+async def async_reload_entry(hass, entry):
+    """Reload the config entry after an options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass, entry):
+    """Remove the stored model state and response cache of a deleted config entry."""
+    await ModelStore(hass, entry.entry_id).async_remove()
+    await ResponseCache(hass, entry.entry_id).async_remove()
+
 async def async_unload_entry(hass, entry):
     """Unload the config entry."""
-    return await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+    unloaded = await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+    if unloaded:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    return unloaded
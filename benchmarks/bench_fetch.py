@@ -0,0 +1,151 @@
+"""
+Offline-Benchmark für den Abrufpfad der direkten Datenquelle (Open-Meteo).
+
+Startet den lokalen Ersatz-Server (openmeteo_standin.py) und misst für
+eine Anzahl Modulflächen:
+
+- Kaltstart ohne Cache (ein Request für alle Flächen)
+- Update mit frischem Cache (keine Requests)
+- Neustart mit frischem Cache auf der Platte (keine Requests)
+- Update nach Ablauf des Caches (bedingte Requests => 304)
+
+Die Flächen verteilen sich auf --sites Standorte und --orientations
+Ausrichtungen; abgefragt wird ein Request für alle Standorte.
+
+Außerdem wird ein Tag mit synthetischen Modellläufen (alle 3 h) simuliert:
+"best_match" (Abruf alle CACHE_MAX_AGE Sekunden) gegen ein Modell mit
+meta.json (Abruf nur nach neuem Lauf). Gezählt werden Forecast-Requests,
+meta.json-Requests und Updates mit geänderten Daten (=> Neuberechnung).
+
+Zuletzt die Umrechnung Einstrahlung => Leistung (transposition.py) für
+alle Strings x 120 Stunden (Median über --repeat Durchläufe).
+
+Benötigt eine Umgebung mit installiertem Home Assistant und numpy:
+
+    python benchmarks/bench_fetch.py
+    python benchmarks/bench_fetch.py --planes 1 5 10 --sites 3 --orientations 2
+"""
+import argparse
+import asyncio
+import importlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_update import PACKAGE, load_integration  # noqa: E402
+import openmeteo_standin  # noqa: E402
+
+
+async def bench_planes(count: int, sites: int, orientations: int, config_dir: str):
+    """Ein Config Entry mit 'count' Modulflächen gegen den Ersatz-Server."""
+    openmeteo = importlib.import_module(f"{PACKAGE}.openmeteo")
+    standin, runner, base = await openmeteo_standin.start()
+    hass = HomeAssistant(config_dir)
+    planes = [
+        openmeteo.Plane(30, -90 + 180 * (i % orientations) / max(orientations - 1, 1), 5.0,
+                        52.52 - (i % sites), 13.41 + (i % sites))
+        for i in range(count)
+    ]
+
+    def make_source():
+        return openmeteo.OpenMeteoSource(hass, f"bench{count}", 52.52, 13.41, planes, url=base)
+
+    rows = []
+
+    async def step(name, source, now=None):
+        before = (standin.requests, standin.not_modified)
+        start = time.perf_counter()
+        await source.async_update(now)
+        rows.append((name, (time.perf_counter() - start) * 1000,
+                     standin.requests - before[0], standin.not_modified - before[1]))
+
+    source = make_source()
+    await step("kalt", source)
+    await step("frisch", source)
+    # Neustart: Cache liegt auf der Platte
+    await source.cache._store.async_save(source.cache._entries)
+    await step("neustart", make_source())
+    await step("abgelaufen", source, time.time() + openmeteo.CACHE_MAX_AGE)
+
+    await hass.async_stop(force=True)
+    await runner.cleanup()
+    return rows
+
+
+async def bench_runs(model: str, config_dir: str, hours: int = 24):
+    """Simulierter Tag: Prüfungen jeweils zu source.next_check(), Uhr des Ersatz-Servers mitgeführt."""
+    openmeteo = importlib.import_module(f"{PACKAGE}.openmeteo")
+    standin, runner, base = await openmeteo_standin.start()
+    hass = HomeAssistant(config_dir)
+    source = openmeteo.OpenMeteoSource(
+        hass, f"runs_{model}", 52.52, 13.41, [openmeteo.Plane(30, 0, 5.0)], model, url=base)
+
+    now = start = time.time()
+    standin.clock = lambda: now
+    checks = changes = 0
+    while now < start + hours * 3600:
+        checks += 1
+        changes += await source.async_update(now)
+        now = source.next_check(now)
+
+    await hass.async_stop(force=True)
+    await runner.cleanup()
+    return {"model": model, "checks": checks, "forecast": standin.requests,
+            "meta": standin.meta_requests, "304": standin.not_modified, "changes": changes}
+
+
+def bench_transposition(count: int, sites: int, repeat: int) -> float:
+    """Median (µs) von plane_power() für 'count' Strings x 120 Stunden."""
+    import numpy as np
+    transposition = importlib.import_module(f"{PACKAGE}.transposition")
+    hours = 24 * 5
+    times = 1750000000.0 + 3600.0 * np.arange(hours)
+    ghi = np.clip(800.0 * np.sin(np.arange(hours) * np.pi / 12.0), 0.0, None)
+    irradiance = np.tile(ghi, (sites, 1))
+    args = (times, 52.52 - np.arange(sites), 13.41 + np.arange(sites),
+            irradiance, irradiance * 0.7, irradiance * 0.3,
+            np.arange(count) % sites, np.full(count, 30.0), np.linspace(-90.0, 90.0, count),
+            np.full(count, 5.0), 0.85)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transposition.plane_power(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--planes", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--sites", type=int, default=2)
+    parser.add_argument("--orientations", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    load_integration()
+    print(f"{'planes':>6} {'schritt':>10} {'ms':>8} {'requests':>8} {'304':>5}")
+    for count in args.planes:
+        with tempfile.TemporaryDirectory() as config_dir:
+            for name, millis, requests, not_modified in asyncio.run(bench_planes(count, args.sites, args.orientations, config_dir)):
+                print(f"{count:>6} {name:>10} {millis:>8.2f} {requests:>8} {not_modified:>5}")
+
+    print()
+    print(f"{'modell':>12} {'prüfungen':>9} {'forecast':>8} {'meta':>5} {'304':>5} {'neu':>5}")
+    for model in ("best_match", "icon_d2"):
+        with tempfile.TemporaryDirectory() as config_dir:
+            row = asyncio.run(bench_runs(model, config_dir))
+        print(f"{row['model']:>12} {row['checks']:>9} {row['forecast']:>8} {row['meta']:>5} "
+              f"{row['304']:>5} {row['changes']:>5}")
+
+    print()
+    print(f"{'strings':>7} {'µs (p50)':>9}")
+    for count in args.planes:
+        print(f"{count:>7} {bench_transposition(count, args.sites, args.repeat):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Offline-Benchmark für den Update-Pfad der sfdb_-Sensoren.
+
+Treibt async_setup_entry() und einen kompletten Refresh aller Entities
+gegen einen In-Memory-Ersatz für hass.states (mit realistischen
+Open-Meteo-Werten) und misst pro Zyklus:
+
+- Latenz (Median / p95)
+- State-Lookups
+- State-Writes
+- Allokationen (tracemalloc)
+
+Außerdem wird über die Anzahl der Strings (1..20) gesweept. Der Sweep über
+die Länge des Forecast-Horizonts ist ein Mikrobenchmark nur der Engine
+(timedif_vector + forecast_vector), ohne Refresh und Entities: der Horizont
+der Integration ist fest (78 h).
+
+Benötigt eine Umgebung mit installiertem Home Assistant und numpy:
+
+    python benchmarks/bench_update.py
+    python benchmarks/bench_update.py --cycles 500 --strings 1 5 9 20
+"""
+import argparse
+import asyncio
+import importlib
+import importlib.util
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from homeassistant.core import Context, State
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "graph_for_omsf"
+
+
+def load_integration():
+    """Lädt das Repo-Verzeichnis als Package 'graph_for_omsf'."""
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, ROOT / "__init__.py", submodule_search_locations=[str(ROOT)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# ------------------------------------------------------------------------------
+# In-Memory State-Machine
+# ------------------------------------------------------------------------------
+class FakeStates:
+    """Ersatz für hass.states, zählt Lookups."""
+
+    def __init__(self):
+        self._states = {}
+        self.lookups = 0
+
+    def get(self, entity_id):
+        self.lookups += 1
+        return self._states.get(entity_id.lower())
+
+    def async_set(self, entity_id, state, attributes=None):
+        self._states[entity_id.lower()] = State(entity_id.lower(), str(state), attributes, context=Context())
+
+    def async_remove(self, entity_id):
+        return self._states.pop(entity_id.lower(), None) is not None
+
+
+def fill_open_meteo(states: FakeStates, index, peak_sensors, rng: random.Random):
+    """Realistische Open-Meteo-Werte für alle Entities aus dem Index."""
+    now = datetime.now().astimezone()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    kwh = {
+        "current_hour": (0.0, 1.2),
+        "next_hour": (0.0, 1.2),
+        "today_remaining": (0.0, 8.0),
+        "today": (2.0, 15.0),
+        "tomorrow": (2.0, 15.0),
+        "d2": (2.0, 15.0),
+        "d3": (2.0, 15.0),
+    }
+    for metric, (low, high) in kwh.items():
+        for ent in index.metrics[metric]:
+            states.async_set(ent, round(rng.uniform(low, high), 3))
+    for rem, nex in index.remaining_dif:
+        states.async_set(rem, round(rng.uniform(0.0, 8.0), 3))
+        states.async_set(nex, round(rng.uniform(0.0, 1.2), 3))
+
+    for day, metric in ((0, "peak_today"), (1, "peak_tomorrow")):
+        for ent in index.metrics[metric]:
+            peak = midnight + timedelta(days=day, hours=13, minutes=rng.randint(-60, 60))
+            states.async_set(ent, peak.isoformat())
+
+    states.async_set("sensor.sun_next_rising", (midnight + timedelta(days=1, hours=6, minutes=45)).isoformat())
+    states.async_set("sensor.sun_next_setting", (midnight + timedelta(hours=19, minutes=30)).isoformat())
+    states.async_set("sensor.energy_production_today_remaining_p8", round(rng.uniform(0.0, 8.0), 3))
+    for ent in peak_sensors:
+        states.async_set(ent, round(rng.uniform(1000, 6000), 1))
+
+
+def fill_series(states: FakeStates, index, rng: random.Random):
+    """Tages-Sensoren mit Stundenreihen (wh_period / watts) wie Open-Meteo Solar Forecast."""
+    now = datetime.now().astimezone()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for ents in index.series:
+        for day, ent in enumerate(ents):
+            wh_period = {}
+            for hour in range(24):
+                start = midnight + timedelta(days=day, hours=hour)
+                wh_period[start] = round(max(0.0, 1 - abs(hour - 13) / 7) * rng.uniform(200, 1200), 1)
+            states.async_set(ent, round(sum(wh_period.values()) / 1000, 3),
+                             {"wh_period": wh_period, "watts": dict(wh_period)})
+
+
+class MemoryStore:
+    """Ersatz für ModelStore (ohne Event-Bus / Dateisystem), zählt Speicheraufträge."""
+
+    def __init__(self):
+        self.saves = 0
+
+    async def async_load(self):
+        return None
+
+    def async_schedule_save(self, inputs, values):
+        self.saves += 1
+
+
+# ------------------------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------------------------
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def bench_entry(integration, string_count: int, cycles: int, static: bool, series: bool = False,
+                      seed: int = 1):
+    """Ein Config Entry mit 'string_count' Strings, 'cycles' komplette Refreshs."""
+    const = integration.const
+    coordinator_mod = importlib.import_module(f"{PACKAGE}.coordinator")
+    sensor_mod = importlib.import_module(f"{PACKAGE}.sensor")
+    upstream_mod = importlib.import_module(f"{PACKAGE}.upstream")
+
+    rng = random.Random(seed)
+    strings = [""] + [f"_{i}" for i in range(2, string_count + 1)]
+    peak_sensors = ["sensor.peak_1", "sensor.peak_2"]
+    entry = SimpleNamespace(
+        entry_id="bench",
+        data={
+            const.CONF_PEAKTIME_SENSORS: peak_sensors,
+            const.CONF_STRINGS: strings,
+            const.CONF_FORECAST_CURVE: True,
+            const.CONF_HOURLY_SERIES: series,
+        },
+        options={},
+    )
+
+    states = FakeStates()
+    hass = SimpleNamespace(states=states, data={}, loop=asyncio.get_running_loop(),
+                           config=SimpleNamespace(time_zone="Europe/Berlin"))
+    fill_open_meteo(states, upstream_mod.UpstreamIndex(strings), peak_sensors, rng)
+    if series:
+        fill_series(states, upstream_mod.UpstreamIndex(strings), rng)
+
+    coordinator = coordinator_mod.SfdbCoordinator(hass, entry)
+    coordinator._store = MemoryStore()
+    hass.data[const.DOMAIN] = {entry.entry_id: coordinator}
+
+    entities = []
+    await sensor_mod.async_setup_entry(hass, entry, lambda new, *args: entities.extend(new))
+    # Wie in HA: standardmäßig deaktivierte Entities (Diagnose) werden nicht hinzugefügt
+    entities = [entity for entity in entities if entity.entity_registry_enabled_default]
+
+    writes = 0
+
+    def count_write():
+        nonlocal writes
+        writes += 1
+
+    for entity in entities:
+        entity.hass = hass
+        entity.async_write_ha_state = count_write
+
+    async def cycle():
+        nonlocal writes
+        if not static:
+            fill_open_meteo(states, coordinator.index, peak_sensors, rng)
+            if series:
+                fill_series(states, coordinator.index, rng)
+        states.lookups = 0
+        writes = 0
+        start = time.perf_counter()
+        coordinator.data = await coordinator._async_update_data()
+        for entity in entities:
+            entity._handle_coordinator_update()
+        return time.perf_counter() - start
+
+    # Latenz / Lookups / Writes ohne tracemalloc-Overhead
+    latencies = []
+    lookups = []
+    write_counts = []
+    for _cycle in range(cycles):
+        latencies.append(await cycle())
+        lookups.append(states.lookups)
+        write_counts.append(writes)
+
+    # Allokationen: Peak über dem Stand vor dem Zyklus
+    allocations = []
+    tracemalloc.start()
+    for _cycle in range(min(cycles, 50)):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await cycle()
+        allocations.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    return {
+        "strings": string_count,
+        "entities": len(entities),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "lookups": statistics.median(lookups),
+        "writes": statistics.median(write_counts),
+        "alloc_kib": statistics.median(allocations) / 1024,
+    }
+
+
+def bench_horizon(integration, lengths, cycles: int):
+    """
+    Mikrobenchmark der Forecast-Engine (timedif_vector + forecast_vector) für
+    verschieden lange Horizonte. Kein Refresh, keine Entities, keine State-Lookups.
+    """
+    import numpy as np
+
+    engine = importlib.import_module(f"{PACKAGE}.engine")
+    rows = []
+    for length in lengths:
+        hours = np.arange(1, length + 1, dtype=float)
+        wraps = engine.wrap_hours(hours)
+        prod = np.full(length, 10.0)
+        timings = []
+        for _cycle in range(cycles):
+            start = time.perf_counter()
+            t_x = engine.timedif_vector(30.0, hours, wraps)
+            engine.forecast_vector(t_x, (20.0, 16.0, 8.0, 4.0), prod, (0.05, 0.1, 0.1, 0.05))
+            timings.append(time.perf_counter() - start)
+        rows.append({"horizon": length, "p50_us": statistics.median(timings) * 1e6,
+                     "p95_us": percentile(timings, 0.95) * 1e6})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--strings", type=int, nargs="+", default=[1, 2, 5, 10, 15, 20])
+    parser.add_argument("--horizons", type=int, nargs="+", default=[28, 96, 384, 1536])
+    parser.add_argument("--static", action="store_true",
+                        help="Upstream-Werte zwischen den Zyklen nicht ändern (Schreib-Gate greift)")
+    parser.add_argument("--series", action="store_true",
+                        help="Stundenreihen aus den Attributen der Tages-Sensoren lesen")
+    args = parser.parse_args()
+
+    integration = load_integration()
+
+    print(f"{'strings':>7} {'entities':>8} {'p50 ms':>8} {'p95 ms':>8} {'lookups':>8} {'writes':>7} {'alloc KiB':>10}")
+    for count in args.strings:
+        row = asyncio.run(bench_entry(integration, count, args.cycles, args.static, args.series))
+        print(f"{row['strings']:>7} {row['entities']:>8} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} "
+              f"{row['lookups']:>8.0f} {row['writes']:>7.0f} {row['alloc_kib']:>10.1f}")
+
+    print()
+    print("Engine-Mikrobenchmark (nur timedif_vector + forecast_vector, ohne Refresh)")
+    print(f"{'horizon':>7} {'p50 us':>8} {'p95 us':>8}")
+    for row in bench_horizon(integration, args.horizons, args.cycles):
+        print(f"{row['horizon']:>7} {row['p50_us']:>8.1f} {row['p95_us']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
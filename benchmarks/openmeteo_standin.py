@@ -0,0 +1,142 @@
+"""
+Lokaler Ersatz für die Open-Meteo Forecast-API (aiohttp).
+
+Liefert die Fixture fixtures/open_meteo_forecast.json (Antwort-Format von
+/v1/forecast mit timeformat=unixtime), die Zeitachse auf den heutigen Tag
+(00:00 UTC, mit past_days entsprechend früher) verschoben, die Tage der
+Fixture so oft wiederholt wie forecast_days + past_days verlangen. Es werden nur die angefragten hourly-Variablen
+zurückgegeben, bei mehreren Standorten als Liste (wie Open-Meteo).
+ETag / If-None-Match => 304. Zählt Requests und 304er und merkt sich die
+Query-Parameter jedes Forecast-Requests.
+
+/data/{model}/static/meta.json liefert synthetische Modellläufe: alle
+'run_interval' Sekunden ein Lauf, abrufbar 'run_delay' Sekunden nach der
+Initialisierung. Die Forecast-Werte ändern sich mit jedem Lauf leicht.
+Die Uhr ('clock') lässt sich für Tests vorstellen, 'forecast_status' (z.B. 429)
+lässt Forecast-Requests fehlschlagen.
+
+    python benchmarks/openmeteo_standin.py --port 8089
+    => http://127.0.0.1:8089/v1/forecast?latitude=52.52&longitude=13.41&hourly=shortwave_radiation,direct_normal_irradiance,diffuse_radiation
+"""
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "open_meteo_forecast.json"
+
+
+class StandIn:
+    """Zustand des Ersatz-Servers (Fixture, Zähler)."""
+
+    def __init__(self, fixture: Path = FIXTURE, run_interval: int = 3 * 3600, run_delay: int = 5400):
+        self.fixture = json.loads(fixture.read_text())
+        self.run_interval = run_interval
+        self.run_delay = run_delay
+        self.clock = time.time
+        # HTTP-Status, mit dem Forecast-Requests abgelehnt werden (None => normale Antwort)
+        self.forecast_status = None
+        self.requests = 0
+        self.queries = []
+        self.meta_requests = 0
+        self.not_modified = 0
+
+    def run(self) -> int:
+        """Initialisierung des letzten abrufbaren Laufs."""
+        return int((self.clock() - self.run_delay) // self.run_interval * self.run_interval)
+
+    def meta(self) -> dict:
+        run = self.run()
+        return {
+            "last_run_initialisation_time": run,
+            "last_run_modification_time": run + self.run_delay - 60,
+            "last_run_availability_time": run + self.run_delay,
+            "temporal_resolution_seconds": 3600,
+            "update_interval_seconds": self.run_interval,
+        }
+
+    def body(self, query):
+        """
+        Antwort für eine Anfrage: Fixture auf heute verschoben, nur angefragte Variablen.
+        Mehrere Standorte (latitude/longitude kommagetrennt) => Liste, ein Objekt je Standort;
+        die Werte werden dabei je Standort leicht skaliert, damit die Spalten unterscheidbar sind.
+        """
+        latitudes = query.get("latitude", str(self.fixture["latitude"])).split(",")
+        longitudes = query.get("longitude", str(self.fixture["longitude"])).split(",")
+        bodies = [self.location(query, float(lat), float(lon), 1.0 - 0.02 * index)
+                  for index, (lat, lon) in enumerate(zip(latitudes, longitudes))]
+        return bodies if len(bodies) > 1 else bodies[0]
+
+    def location(self, query, latitude: float, longitude: float, scale: float) -> dict:
+        hourly = self.fixture["hourly"]
+        past_days = int(query.get("past_days", 0))
+        # Erste Stunde (Ende 01:00 UTC) 'past_days' Tage vor heute
+        first = (int(self.clock()) // 86400 - past_days) * 86400 + 3600
+        # Jeder Lauf ein wenig anders
+        scale *= 1.0 + 0.01 * (self.run() // self.run_interval % 5)
+        hours = 24 * (int(query.get("forecast_days", 4)) + past_days)
+        variables = [var for var in query.get("hourly", "").split(",") if var]
+        return {
+            **{key: val for key, val in self.fixture.items() if key not in ("hourly", "hourly_units")},
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly_units": {var: self.fixture["hourly_units"].get(var, "W/m²") for var in ["time", *variables]},
+            "hourly": {
+                "time": [first + hour * 3600 for hour in range(hours)],
+                # Tage der Fixture wiederholt; unbekannte Variablen => Werte der geneigten Fläche
+                **{var: [round(values[hour % len(values)] * scale, 1) for hour in range(hours)]
+                   for var, values in ((var, hourly.get(var, hourly["global_tilted_irradiance"]))
+                                       for var in variables)},
+            },
+        }
+
+    async def handle_forecast(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.queries.append(dict(request.query))
+        if self.forecast_status is not None:
+            return web.Response(status=self.forecast_status)
+        return self.respond(request, self.body(request.query))
+
+    async def handle_meta(self, request: web.Request) -> web.Response:
+        self.meta_requests += 1
+        return self.respond(request, self.meta())
+
+    def respond(self, request: web.Request, body) -> web.Response:
+        raw = json.dumps(body, separators=(",", ":")).encode()
+        etag = '"' + hashlib.blake2b(raw, digest_size=8).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=raw, content_type="application/json", headers={"ETag": etag})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/forecast", self.handle_forecast)
+        app.router.add_get("/data/{model}/static/meta.json", self.handle_meta)
+        return app
+
+
+async def start(host: str = "127.0.0.1", port: int = 0):
+    """Server starten => (StandIn, Runner, Basis-URL)."""
+    standin = StandIn()
+    runner = web.AppRunner(standin.app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return standin, runner, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+    web.run_app(StandIn().app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
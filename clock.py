@@ -0,0 +1,47 @@
+"""
+Stunden-Kalender für den Forecast-Horizont (heute, morgen, d2, d3).
+
+Wird einmal pro Tag aus der in Home Assistant konfigurierten Zeitzone
+aufgebaut. Tagesgrenzen kommen aus der Zeitzone (23/25-Stunden-Tage bei
+der Zeitumstellung), Stundengrenzen sind Mitternacht + k * 3600. Danach
+sind alle Abfragen reine Arithmetik bzw. Tupel-Zugriffe.
+"""
+from datetime import date, datetime, time, timedelta, tzinfo
+
+# heute, morgen, d2, d3
+CALENDAR_DAYS = 4
+
+
+class CalendarIndex:
+    """Lokale Stunden von heute..d3 => Unix-Zeit."""
+
+    def __init__(self, tz: tzinfo, day: date):
+        self.tz = tz
+        self.day = day
+        # Tagesanfänge heute..d4 plus Ende von d4 (d4 nur für den Umbruch der Horizonte bis 96 h)
+        starts = tuple(
+            datetime.combine(day + timedelta(days=offset), time(), tzinfo=tz).timestamp()
+            for offset in range(CALENDAR_DAYS + 2)
+        )
+        # Tagesanfänge heute..d3 plus Ende von d3
+        self.day_starts = starts[:CALENDAR_DAYS + 1]
+        self.midnight = self.day_starts[0]
+        # Stunden je Tag heute..d4 (23/24/25 bei der Zeitumstellung)
+        self.day_hours = tuple((end - start) / 3600 for start, end in zip(starts, starts[1:]))
+
+    @classmethod
+    def for_timestamp(cls, tz: tzinfo, ts: float) -> "CalendarIndex":
+        """Kalender für den lokalen Tag von 'ts'."""
+        return cls(tz, datetime.fromtimestamp(ts, tz).date())
+
+    def covers(self, ts: float) -> bool:
+        """True, solange 'ts' im ersten Tag (heute) liegt."""
+        return self.day_starts[0] <= ts < self.day_starts[1]
+
+    def hour_index(self, ts: float) -> int:
+        """Index der Stunde von 'ts' ab Mitternacht heute."""
+        return int((ts - self.midnight) // 3600)
+
+    def hour_start(self, ts: float) -> float:
+        """Anfang der lokalen Stunde von 'ts' (Unix-Zeit)."""
+        return self.midnight + self.hour_index(ts) * 3600
@@ -1,7 +1,7 @@
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_NAME, CONF_LATITUDE, CONF_LONGITUDE
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
@@ -11,8 +11,43 @@ from .const import (
     CONF_SUN_RISING,
     CONF_SUN_SETTING,
     CONF_ENERGY_REDUZIERT,
-    DEFAULT_ENERGY_REDUZIERT
+    DEFAULT_ENERGY_REDUZIERT,
+    CONF_FORECAST_CURVE,
+    DEFAULT_FORECAST_CURVE,
+    CONF_HOURLY_SENSORS,
+    DEFAULT_HOURLY_SENSORS,
+    CONF_EXPOSE_INTERMEDIATES,
+    DEFAULT_EXPOSE_INTERMEDIATES,
+    CONF_HOURLY_SERIES,
+    DEFAULT_HOURLY_SERIES,
+    CONF_DIRECT_SOURCE,
+    DEFAULT_DIRECT_SOURCE,
+    CONF_PLANES,
+    CONF_WEATHER_MODEL,
+    CONF_STRINGS,
+    DEFAULT_STRINGS,
+    CONF_QUIET_WINDOW,
+    DEFAULT_QUIET_WINDOW,
+    CONF_MAX_DELAY,
+    DEFAULT_MAX_DELAY,
+    CONF_WRITE_GATE,
+    DEFAULT_WRITE_GATE
 )
+from .openmeteo import DEFAULT_MODEL, parse_planes, format_planes
+from .upstream import parse_string_suffixes, format_string_suffixes
+
+# Schreib-Gate: Parameter je Familie => Validierung (Toleranzen >= 0, relativ höchstens 1, Sekunden >= 0)
+WRITE_GATE_FIELDS = {
+    "abs_epsilon": vol.All(vol.Coerce(float), vol.Range(min=0)),
+    "rel_epsilon": vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+    "min_interval": vol.All(vol.Coerce(float), vol.Range(min=0)),
+    "max_interval": vol.All(vol.Coerce(float), vol.Range(min=0)),
+}
+
+
+def write_gate_field(family: str, param: str) -> str:
+    """Formularfeld eines Schreib-Gate-Parameters, z.B. "forecast_abs_epsilon"."""
+    return f"{family}_{param}"
 
 class SolarForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Config Flow für graph_for_omsf."""
@@ -37,11 +72,25 @@ class SolarForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 if field in user_input and user_input[field].strip():
                     peaktime_sensors.append(user_input[field].strip())
 
+            # String-Suffixe, z.B. "ohne,_2,_3"
+            strings = parse_string_suffixes(user_input.get(CONF_STRINGS, ""))
+            # Modulflächen, z.B. "30/0/5.0, 30/-90/3.2@48.14/11.58"
+            try:
+                planes = parse_planes(user_input.get(CONF_PLANES, ""))
+            except ValueError:
+                planes = None
+
             if not peaktime_sensors:
                 # Mindestens 1 Sensor muss eingetragen sein
                 self._errors["base"] = "no_peaks"
+            elif not strings:
+                self._errors["base"] = "no_strings"
+            elif planes is None or (user_input.get(CONF_DIRECT_SOURCE) and not planes):
+                self._errors["base"] = "invalid_planes"
             else:
                 user_input[CONF_PEAKTIME_SENSORS] = peaktime_sensors
+                user_input[CONF_STRINGS] = strings
+                user_input[CONF_PLANES] = [list(plane) for plane in planes]
                 return self.async_create_entry(
                     title=user_input[CONF_NAME],
                     data=user_input
@@ -55,6 +104,18 @@ class SolarForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             user_input[CONF_SUN_RISING] = "sensor.sun_next_rising"
             user_input[CONF_SUN_SETTING] = "sensor.sun_next_setting"
             user_input[CONF_ENERGY_REDUZIERT] = DEFAULT_ENERGY_REDUZIERT
+            user_input[CONF_FORECAST_CURVE] = DEFAULT_FORECAST_CURVE
+            user_input[CONF_HOURLY_SENSORS] = DEFAULT_HOURLY_SENSORS
+            user_input[CONF_EXPOSE_INTERMEDIATES] = DEFAULT_EXPOSE_INTERMEDIATES
+            user_input[CONF_HOURLY_SERIES] = DEFAULT_HOURLY_SERIES
+            user_input[CONF_DIRECT_SOURCE] = DEFAULT_DIRECT_SOURCE
+            user_input[CONF_PLANES] = ""
+            user_input[CONF_WEATHER_MODEL] = DEFAULT_MODEL
+            user_input[CONF_LATITUDE] = self.hass.config.latitude
+            user_input[CONF_LONGITUDE] = self.hass.config.longitude
+            user_input[CONF_STRINGS] = format_string_suffixes(DEFAULT_STRINGS)
+            user_input[CONF_QUIET_WINDOW] = DEFAULT_QUIET_WINDOW
+            user_input[CONF_MAX_DELAY] = DEFAULT_MAX_DELAY
 
         return await self._show_form(user_input)
 
@@ -69,12 +130,33 @@ class SolarForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Optional("sensor_4", default=user_input["sensor_4"]): cv.string,
             vol.Optional("sensor_5", default=user_input["sensor_5"]): cv.string,
 
+            # String-Suffixe (kommagetrennt, "ohne" = kein Suffix)
+            vol.Optional(CONF_STRINGS, default=user_input[CONF_STRINGS]): cv.string,
+
             # Sun-Sensoren
             vol.Optional(CONF_SUN_RISING, default=user_input[CONF_SUN_RISING]): cv.string,
             vol.Optional(CONF_SUN_SETTING, default=user_input[CONF_SUN_SETTING]): cv.string,
 
             # energy_reduziert
             vol.Required(CONF_ENERGY_REDUZIERT, default=user_input[CONF_ENERGY_REDUZIERT]): vol.Coerce(float),
+
+            # Forecast-Kurve / Stunden-Sensoren
+            vol.Optional(CONF_FORECAST_CURVE, default=user_input[CONF_FORECAST_CURVE]): cv.boolean,
+            vol.Optional(CONF_HOURLY_SENSORS, default=user_input[CONF_HOURLY_SENSORS]): cv.boolean,
+            # Debug: Zwischenwerte als Entities
+            vol.Optional(CONF_EXPOSE_INTERMEDIATES, default=user_input[CONF_EXPOSE_INTERMEDIATES]): cv.boolean,
+            # Stundenreihen aus den Attributen der Tages-Sensoren
+            vol.Optional(CONF_HOURLY_SERIES, default=user_input[CONF_HOURLY_SERIES]): cv.boolean,
+            # Direkte Datenquelle (Open-Meteo-API): Modulflächen "Neigung/Azimut/kWp[@Breite/Länge]" je String
+            vol.Optional(CONF_DIRECT_SOURCE, default=user_input[CONF_DIRECT_SOURCE]): cv.boolean,
+            vol.Optional(CONF_PLANES, default=user_input[CONF_PLANES]): cv.string,
+            vol.Optional(CONF_WEATHER_MODEL, default=user_input[CONF_WEATHER_MODEL]): cv.string,
+            vol.Optional(CONF_LATITUDE, default=user_input[CONF_LATITUDE]): cv.latitude,
+            vol.Optional(CONF_LONGITUDE, default=user_input[CONF_LONGITUDE]): cv.longitude,
+
+            # Upstream-Änderungen zusammenfassen (Sekunden)
+            vol.Optional(CONF_QUIET_WINDOW, default=user_input[CONF_QUIET_WINDOW]): vol.Coerce(float),
+            vol.Optional(CONF_MAX_DELAY, default=user_input[CONF_MAX_DELAY]): vol.Coerce(float),
         })
 
         return self.async_show_form(
@@ -90,6 +172,8 @@ class SolarForecastOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         self.config_entry = config_entry
         self._errors = {}
+        # Options aus dem ersten Schritt
+        self._options = {}
 
     async def async_step_init(self, user_input=None):
         """Start der Optionen."""
@@ -105,11 +189,24 @@ class SolarForecastOptionsFlowHandler(config_entries.OptionsFlow):
                 if field in user_input and user_input[field].strip():
                     peaktime_sensors.append(user_input[field].strip())
 
+            # Leer => bisherige, fest verdrahtete Suffixe
+            strings = parse_string_suffixes(user_input.get(CONF_STRINGS, ""))
+            try:
+                planes = parse_planes(user_input.get(CONF_PLANES, ""))
+            except ValueError:
+                planes = None
+
             if not peaktime_sensors:
                 self._errors["base"] = "no_peaks"
+            elif planes is None or (user_input.get(CONF_DIRECT_SOURCE) and not planes):
+                self._errors["base"] = "invalid_planes"
             else:
                 user_input[CONF_PEAKTIME_SENSORS] = peaktime_sensors
-                return self.async_create_entry(title="", data=user_input)
+                user_input[CONF_STRINGS] = strings or None
+                user_input[CONF_PLANES] = [list(plane) for plane in planes]
+                # Weiter mit dem Schreib-Gate; übrige Options bleiben erhalten
+                self._options = {**self.config_entry.options, **user_input}
+                return await self.async_step_write_gate()
         else:
             # Bestehende Daten + Options
             data = {**self.config_entry.data, **self.config_entry.options}
@@ -126,6 +223,18 @@ class SolarForecastOptionsFlowHandler(config_entries.OptionsFlow):
             user_input[CONF_SUN_RISING] = data.get(CONF_SUN_RISING, "sensor.sun_next_rising")
             user_input[CONF_SUN_SETTING] = data.get(CONF_SUN_SETTING, "sensor.sun_next_setting")
             user_input[CONF_ENERGY_REDUZIERT] = data.get(CONF_ENERGY_REDUZIERT, DEFAULT_ENERGY_REDUZIERT)
+            user_input[CONF_FORECAST_CURVE] = data.get(CONF_FORECAST_CURVE, DEFAULT_FORECAST_CURVE)
+            user_input[CONF_HOURLY_SENSORS] = data.get(CONF_HOURLY_SENSORS, DEFAULT_HOURLY_SENSORS)
+            user_input[CONF_EXPOSE_INTERMEDIATES] = data.get(CONF_EXPOSE_INTERMEDIATES, DEFAULT_EXPOSE_INTERMEDIATES)
+            user_input[CONF_HOURLY_SERIES] = data.get(CONF_HOURLY_SERIES, DEFAULT_HOURLY_SERIES)
+            user_input[CONF_DIRECT_SOURCE] = data.get(CONF_DIRECT_SOURCE, DEFAULT_DIRECT_SOURCE)
+            user_input[CONF_PLANES] = format_planes(data.get(CONF_PLANES) or [])
+            user_input[CONF_WEATHER_MODEL] = data.get(CONF_WEATHER_MODEL, DEFAULT_MODEL)
+            user_input[CONF_LATITUDE] = data.get(CONF_LATITUDE, self.hass.config.latitude)
+            user_input[CONF_LONGITUDE] = data.get(CONF_LONGITUDE, self.hass.config.longitude)
+            user_input[CONF_STRINGS] = format_string_suffixes(data.get(CONF_STRINGS) or [])
+            user_input[CONF_QUIET_WINDOW] = data.get(CONF_QUIET_WINDOW, DEFAULT_QUIET_WINDOW)
+            user_input[CONF_MAX_DELAY] = data.get(CONF_MAX_DELAY, DEFAULT_MAX_DELAY)
 
         data_schema = vol.Schema({
             vol.Required(CONF_NAME, default=user_input[CONF_NAME]): cv.string,
@@ -136,10 +245,31 @@ class SolarForecastOptionsFlowHandler(config_entries.OptionsFlow):
             vol.Optional("sensor_4", default=user_input["sensor_4"]): cv.string,
             vol.Optional("sensor_5", default=user_input["sensor_5"]): cv.string,
 
+            # String-Suffixe (kommagetrennt, "ohne" = kein Suffix)
+            vol.Optional(CONF_STRINGS, default=user_input[CONF_STRINGS]): cv.string,
+
             vol.Optional(CONF_SUN_RISING, default=user_input[CONF_SUN_RISING]): cv.string,
             vol.Optional(CONF_SUN_SETTING, default=user_input[CONF_SUN_SETTING]): cv.string,
 
             vol.Required(CONF_ENERGY_REDUZIERT, default=user_input[CONF_ENERGY_REDUZIERT]): vol.Coerce(float),
+
+            # Forecast-Kurve / Stunden-Sensoren
+            vol.Optional(CONF_FORECAST_CURVE, default=user_input[CONF_FORECAST_CURVE]): cv.boolean,
+            vol.Optional(CONF_HOURLY_SENSORS, default=user_input[CONF_HOURLY_SENSORS]): cv.boolean,
+            # Debug: Zwischenwerte als Entities
+            vol.Optional(CONF_EXPOSE_INTERMEDIATES, default=user_input[CONF_EXPOSE_INTERMEDIATES]): cv.boolean,
+            # Stundenreihen aus den Attributen der Tages-Sensoren
+            vol.Optional(CONF_HOURLY_SERIES, default=user_input[CONF_HOURLY_SERIES]): cv.boolean,
+            # Direkte Datenquelle (Open-Meteo-API): Modulflächen "Neigung/Azimut/kWp[@Breite/Länge]" je String
+            vol.Optional(CONF_DIRECT_SOURCE, default=user_input[CONF_DIRECT_SOURCE]): cv.boolean,
+            vol.Optional(CONF_PLANES, default=user_input[CONF_PLANES]): cv.string,
+            vol.Optional(CONF_WEATHER_MODEL, default=user_input[CONF_WEATHER_MODEL]): cv.string,
+            vol.Optional(CONF_LATITUDE, default=user_input[CONF_LATITUDE]): cv.latitude,
+            vol.Optional(CONF_LONGITUDE, default=user_input[CONF_LONGITUDE]): cv.longitude,
+
+            # Upstream-Änderungen zusammenfassen (Sekunden)
+            vol.Optional(CONF_QUIET_WINDOW, default=user_input[CONF_QUIET_WINDOW]): vol.Coerce(float),
+            vol.Optional(CONF_MAX_DELAY, default=user_input[CONF_MAX_DELAY]): vol.Coerce(float),
         })
 
         return self.async_show_form(
@@ -147,3 +277,34 @@ class SolarForecastOptionsFlowHandler(config_entries.OptionsFlow):
             data_schema=data_schema,
             errors=self._errors
         )
+
+    async def async_step_write_gate(self, user_input=None):
+        """Schreib-Gate je Sensor-Familie: Toleranzen und Intervalle (Sekunden, 0 = aus)."""
+        errors = {}
+        gate = {
+            family: {**params, **self._options.get(CONF_WRITE_GATE, {}).get(family, {})}
+            for family, params in DEFAULT_WRITE_GATE.items()
+        }
+        if user_input is not None:
+            gate = {
+                family: {param: user_input[write_gate_field(family, param)] for param in WRITE_GATE_FIELDS}
+                for family in DEFAULT_WRITE_GATE
+            }
+            if any(params["max_interval"] and params["max_interval"] < params["min_interval"]
+                   for params in gate.values()):
+                # Erneutes Schreiben darf nicht häufiger sein als das Mindestintervall
+                errors["base"] = "invalid_write_gate"
+            else:
+                return self.async_create_entry(title="", data={**self._options, CONF_WRITE_GATE: gate})
+
+        data_schema = vol.Schema({
+            vol.Optional(write_gate_field(family, param), default=params[param]): validator
+            for family, params in gate.items()
+            for param, validator in WRITE_GATE_FIELDS.items()
+        })
+
+        return self.async_show_form(
+            step_id="write_gate",
+            data_schema=data_schema,
+            errors=errors
+        )
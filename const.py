@@ -12,3 +12,53 @@ CONF_SUN_SETTING = "sun_setting"
 CONF_ENERGY_REDUZIERT = "energy_reduziert"
 DEFAULT_ENERGY_REDUZIERT = 0.6
 
+
+# Forecast-Kurve (ein Sensor mit allen Horizonten als Attribut)
+CONF_FORECAST_CURVE = "forecast_curve"
+DEFAULT_FORECAST_CURVE = False
+
+# Einzelne Stunden-Sensoren (sfdb_energy_XXh_SUM/_SUM_z, sfdb_energy_timedif_XXh)
+CONF_HOURLY_SENSORS = "hourly_sensors"
+DEFAULT_HOURLY_SENSORS = True
+
+# Debug: Zwischenwerte (Time-Diff XXh / 1..4, Sun dif_z, Reduziert 01..04) als Entities
+CONF_EXPOSE_INTERMEDIATES = "expose_intermediates"
+DEFAULT_EXPOSE_INTERMEDIATES = False
+
+# Schreib-Gate je Sensor-Familie:
+# abs_epsilon / rel_epsilon => Toleranz, min_interval / max_interval => Sekunden
+CONF_WRITE_GATE = "write_gate"
+DEFAULT_WRITE_GATE = {
+    "peak": {"abs_epsilon": 0.0, "rel_epsilon": 0.0, "min_interval": 0, "max_interval": 3600},
+    "sun": {"abs_epsilon": 0.0, "rel_epsilon": 0.0, "min_interval": 0, "max_interval": 3600},
+    "timedif": {"abs_epsilon": 0.0, "rel_epsilon": 0.0, "min_interval": 0, "max_interval": 3600},
+    "reduziert": {"abs_epsilon": 0.0, "rel_epsilon": 0.0, "min_interval": 0, "max_interval": 3600},
+    "production": {"abs_epsilon": 0.0, "rel_epsilon": 0.0, "min_interval": 0, "max_interval": 3600},
+    "forecast": {"abs_epsilon": 0.0, "rel_epsilon": 0.0, "min_interval": 0, "max_interval": 3600},
+}
+
+# String-Suffixe der Open-Meteo-Sensoren (z.B. "", "_2", "_6"); fehlt der Eintrag,
+# gelten die bisher fest verdrahteten Suffixe
+CONF_STRINGS = "strings"
+DEFAULT_STRINGS = ["_6", "_7", "_8", "_9", "_10"]
+
+# Zusammenfassen von Upstream-Änderungen (Sekunden): Ruhefenster / maximale Verzögerung
+CONF_QUIET_WINDOW = "quiet_window"
+DEFAULT_QUIET_WINDOW = 2.0
+CONF_MAX_DELAY = "max_delay"
+DEFAULT_MAX_DELAY = 10.0
+
+# Stundenreihen (Attribute wh_period / watts der Tages-Sensoren) statt der
+# Einzel-Sensoren current_hour / next_hour / today_remaining / Peak-Zeiten
+CONF_HOURLY_SERIES = "hourly_series"
+DEFAULT_HOURLY_SERIES = False
+
+# Direkte Datenquelle Open-Meteo (statt der Sensoren der Solar-Forecast-Integration)
+CONF_DIRECT_SOURCE = "direct_source"
+DEFAULT_DIRECT_SOURCE = False
+# Modulflächen je String als [Neigung, Azimut, kWp] (Azimut 0 = Süd, -90 = Ost, 90 = West),
+# im Formular "Neigung/Azimut/kWp" kommagetrennt
+CONF_PLANES = "planes"
+# Wettermodell der direkten Datenquelle ("best_match" oder z.B. "icon_d2"); bei Modellen
+# mit Laufinfo wird nur nach einem neuen Modelllauf abgerufen
+CONF_WEATHER_MODEL = "weather_model"
@@ -0,0 +1,539 @@
+import logging
+from datetime import datetime
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, Event, callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_call_later
+)
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_PEAKTIME_SENSORS,
+    CONF_SUN_RISING,
+    CONF_SUN_SETTING,
+    CONF_ENERGY_REDUZIERT,
+    DEFAULT_ENERGY_REDUZIERT,
+    CONF_WRITE_GATE,
+    DEFAULT_WRITE_GATE,
+    CONF_STRINGS,
+    CONF_QUIET_WINDOW,
+    DEFAULT_QUIET_WINDOW,
+    CONF_MAX_DELAY,
+    DEFAULT_MAX_DELAY,
+    CONF_HOURLY_SERIES,
+    DEFAULT_HOURLY_SERIES,
+    CONF_DIRECT_SOURCE,
+    DEFAULT_DIRECT_SOURCE,
+    CONF_PLANES,
+    CONF_WEATHER_MODEL
+)
+from .clock import CalendarIndex
+from .gate import WriteGate
+from .horizon import DayRing
+from .model import (
+    EVAL_ORDER,
+    CLOCK_ORDER,
+    CLOCK_INPUTS,
+    CLOCK_STEP,
+    next_clock_change,
+    compute_model,
+    compute_clock,
+    compute_changed,
+    changed_inputs
+)
+from .openmeteo import DEFAULT_MODEL, OpenMeteoSource, Plane
+from .persist import ModelStore
+from .scheduler import CoalescingScheduler
+from .series import StringSeries, derive_inputs, parse_day, uncovered_inputs
+from .stats import UpdateStats
+from .upstream import (
+    UpstreamIndex,
+    FIXED_ENTITIES,
+    SUN_NEXT_RISING,
+    SUN_NEXT_SETTING,
+    PROD_REMAIN
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Höchstens so lange (Sekunden) wird nach dem Start der wiederhergestellte Stand gehalten
+RESTORE_GRACE = 120
+
+
+def _parse_float(val, default: float = 0.0) -> float:
+    """State-String => float, sonst 'default'."""
+    if val in ("unknown", "unavailable", None):
+        return default
+    try:
+        return float(val)
+    except ValueError:
+        return default
+
+
+def _parse_timestamp(val):
+    """State-String (Unix-Timestamp oder ISO-8601) => Unix-Time, sonst None."""
+    if val in ("unknown", "unavailable", None):
+        return None
+    # Versuch: float
+    try:
+        return float(val)
+    except ValueError:
+        pass
+    # Versuch: ISO-8601
+    try:
+        dt = datetime.fromisoformat(val)
+        return dt.timestamp()
+    except ValueError:
+        return None
+
+
+def float_state(hass: HomeAssistant, entity_id: str, default: float = 0.0) -> float:
+    """
+    Liest den Status eines Sensors aus und konvertiert ihn zu float.
+    Gibt 'default' zurück, falls nicht verfügbar oder konvertierbar.
+    """
+    state_obj = hass.states.get(entity_id)
+    if not state_obj:
+        return default
+    return _parse_float(state_obj.state, default)
+
+
+def timestamp_state(hass: HomeAssistant, entity_id: str):
+    """
+    Versucht, den State als Unix-Timestamp (float) oder ISO-8601-Datum
+    zu interpretieren. Gibt None zurück, falls es nicht klappt.
+    """
+    state_obj = hass.states.get(entity_id)
+    if not state_obj:
+        return None
+    return _parse_timestamp(state_obj.state)
+
+
+class StateParseCache:
+    """
+    Cache für geparste States (float / Timestamp).
+    Schlüssel ist die entity_id, gültig solange last_updated und Context
+    des State-Objekts gleich sind. Jeder Upstream-State wird so nur einmal
+    pro Änderung geparst. Entfernte Entities werden beim nächsten Lesen verworfen.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        # entity_id => (last_updated, context_id, {art: wert})
+        self._cache = {}
+        # Anzahl State-Lookups (für die Laufzeit-Statistik)
+        self.lookups = 0
+
+    def _lookup(self, entity_id: str, kind: str, parse, attributes: bool = False):
+        self.lookups += 1
+        state_obj = self._hass.states.get(entity_id)
+        if not state_obj:
+            self._cache.pop(entity_id, None)
+            return parse(None)
+        entry = self._cache.get(entity_id)
+        if (entry is None or entry[0] != state_obj.last_updated
+                or entry[1] != state_obj.context.id):
+            entry = (state_obj.last_updated, state_obj.context.id, {})
+            self._cache[entity_id] = entry
+        parsed = entry[2]
+        if kind not in parsed:
+            parsed[kind] = parse(state_obj.attributes if attributes else state_obj.state)
+        return parsed[kind]
+
+    def float_state(self, entity_id: str, default: float = 0.0) -> float:
+        """Wie float_state(), aber gecacht."""
+        return self._lookup(entity_id, ("float", default), lambda val: _parse_float(val, default))
+
+    def timestamp_state(self, entity_id: str):
+        """Wie timestamp_state(), aber gecacht."""
+        return self._lookup(entity_id, "timestamp", _parse_timestamp)
+
+    def series_state(self, entity_id: str) -> tuple:
+        """Stundenreihen (Energie, Leistung) aus den Attributen, gecacht."""
+        return self._lookup(entity_id, "series", parse_day, attributes=True)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def now_timestamp() -> float:
+    """Aktuelle Unix-Time (float)."""
+    return datetime.now().timestamp()
+
+
+class SfdbCoordinator(DataUpdateCoordinator):
+    """
+    Ein Coordinator pro Config Entry.
+    Liest alle Open-Meteo-Eingänge einmal und berechnet daraus sämtliche
+    sfdb_-Werte in einem Durchlauf. Kein Polling: neu gerechnet wird nur,
+    wenn sich einer der gelesenen Upstream-Sensoren ändert. Mehrere Änderungen
+    kurz hintereinander werden zu einem Durchlauf zusammengefasst.
+    Sobald sich ein uhrzeitabhängiger Wert ändert (0.1-h-Schritt, volle Stunde,
+    Peak-Abstand), wird nur der uhrzeitabhängige Teil des Modells neu gerechnet,
+    um Mitternacht wird der Horizont um einen Tag verschoben. Der letzte Stand wird gespeichert und
+    beim Setup sofort wiederhergestellt.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=None,
+        )
+        self._entry = entry
+        self.parse_cache = StateParseCache(hass)
+        self.stats = UpdateStats()
+        # Upstream-entity_ids einmalig aus der String-Konfiguration
+        config = self.config
+        self.index = UpstreamIndex(config.get(CONF_STRINGS))
+        # Stundenreihen aus den Attributen statt der Einzel-Sensoren
+        self.hourly_series = config.get(CONF_HOURLY_SERIES, DEFAULT_HOURLY_SERIES)
+        # Tages-Sensoren eines Strings => (geparste Tage, StringSeries), neu nur bei Änderung
+        self._series = {}
+        # Direkte Datenquelle (Open-Meteo-API) statt der Upstream-Sensoren
+        self.source = None
+        if config.get(CONF_DIRECT_SOURCE, DEFAULT_DIRECT_SOURCE):
+            self.source = OpenMeteoSource(
+                hass,
+                entry.entry_id,
+                config.get(CONF_LATITUDE, hass.config.latitude),
+                config.get(CONF_LONGITUDE, hass.config.longitude),
+                [Plane(*plane) for plane in config.get(CONF_PLANES) or []],
+                config.get(CONF_WEATHER_MODEL) or DEFAULT_MODEL,
+            )
+        self._unsub_upstream = None
+        self._unsub_clock = None
+        self._unsub_source = None
+        # Eingänge des letzten vollständigen Durchlaufs (Basis für den Uhrzeit-Tick)
+        self._inputs = None
+        # Stunden-Kalender heute..d3, wird beim Tageswechsel neu aufgebaut
+        self._calendar = None
+        # Tages-Slots heute..d3, rotieren um Mitternacht
+        self._ring = DayRing()
+        # Gespeicherter Stand
+        self._store = ModelStore(hass, entry.entry_id)
+        # Wiederhergestellten Stand halten bis zum ersten Upstream-Event, höchstens bis hierhin
+        self._restore_hold_until = None
+        self._unsub_restore = None
+        # Bursts (alle Strings kurz nacheinander) => ein Durchlauf
+        self._refresh_scheduler = CoalescingScheduler(
+            hass,
+            config.get(CONF_QUIET_WINDOW, DEFAULT_QUIET_WINDOW),
+            config.get(CONF_MAX_DELAY, DEFAULT_MAX_DELAY),
+            self.async_refresh,
+        )
+
+    @property
+    def config(self) -> dict:
+        """Config-Daten inkl. Options."""
+        return {**self._entry.data, **self._entry.options}
+
+    def write_gate(self, family: str) -> WriteGate:
+        """Neues Schreib-Gate mit den Parametern der Familie (Options überschreiben Defaults)."""
+        params = dict(DEFAULT_WRITE_GATE.get(family, {}))
+        params.update(self.config.get(CONF_WRITE_GATE, {}).get(family, {}))
+        return WriteGate(**params)
+
+    def tracked_entity_ids(self) -> set:
+        """Alle Upstream-entity_ids, die in _read_inputs() gelesen werden."""
+        config = self.config
+        if self.source is not None:
+            ids = set(FIXED_ENTITIES) - {PROD_REMAIN}
+        else:
+            ids = self.index.entity_ids(self.hourly_series)
+        ids.update(config.get(CONF_PEAKTIME_SENSORS, []))
+        ids.add(config.get(CONF_SUN_RISING, SUN_NEXT_RISING))
+        ids.add(config.get(CONF_SUN_SETTING, SUN_NEXT_SETTING))
+        return ids
+
+    @callback
+    def async_start(self) -> None:
+        """Abo auf alle Upstream-Sensoren und Uhrzeit-Tick (einmal pro Entry)."""
+        self.async_stop()
+        self._unsub_upstream = async_track_state_change_event(
+            self.hass, sorted(self.tracked_entity_ids()), self._handle_upstream_change
+        )
+        self._schedule_clock_tick()
+        if self.source is not None:
+            self._schedule_source_check()
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub_upstream is not None:
+            self._unsub_upstream()
+            self._unsub_upstream = None
+        if self._unsub_clock is not None:
+            self._unsub_clock()
+            self._unsub_clock = None
+        if self._unsub_source is not None:
+            self._unsub_source()
+            self._unsub_source = None
+        if self._unsub_restore is not None:
+            self._unsub_restore()
+            self._unsub_restore = None
+        self._refresh_scheduler.async_cancel()
+
+    async def async_restore(self) -> bool:
+        """
+        Letzten gespeicherten Stand als self.data übernehmen (nur vom selben Tag).
+        Die uhrzeitabhängigen Werte werden dabei sofort neu gerechnet.
+        """
+        stored = await self._store.async_load()
+        if stored is None:
+            return False
+        clock = self._read_clock()
+        if not self.calendar(clock["now"]).covers(stored["computed_at"]):
+            return False
+        if set(EVAL_ORDER) - set(CLOCK_ORDER) - stored["values"].keys():
+            # Gespeichert mit einem anderen Modellstand
+            return False
+        self._inputs = {**stored["inputs"], **clock}
+        self._restore_hold_until = clock["now"] + RESTORE_GRACE
+        self.data = compute_clock(self._inputs, stored["values"])
+        return True
+
+    @callback
+    def async_revalidate(self) -> None:
+        """
+        Wiederhergestellten Stand (zusammengefasst) gegen die Upstream-Sensoren prüfen.
+        Spätestens nach RESTORE_GRACE wird auf jeden Fall neu gerechnet.
+        """
+        self._refresh_scheduler.async_schedule()
+        self._unsub_restore = async_call_later(self.hass, RESTORE_GRACE, self._handle_restore_timeout)
+
+    @callback
+    def _handle_restore_timeout(self, now: datetime) -> None:
+        self._unsub_restore = None
+        self._refresh_scheduler.async_schedule()
+
+    def _upstream_ready(self) -> bool:
+        """
+        True, sobald die Open-Meteo-Sensoren geladen sind (ein Tages-Sensor mit Wert).
+        Einzelne fehlende oder deaktivierte Entities halten den Stand nicht fest.
+        """
+        if self.source is not None:
+            return True
+        for ent in self.index.metrics["today"]:
+            state_obj = self.hass.states.get(ent)
+            if state_obj is not None and state_obj.state not in ("unknown", "unavailable"):
+                return True
+        return False
+
+    @callback
+    def _handle_upstream_change(self, event: Event) -> None:
+        """Ein Upstream-Sensor hat sich geändert => (zusammengefasst) neu rechnen."""
+        # Upstream ist da => wiederhergestellten Stand nicht länger halten
+        self._restore_hold_until = None
+        self._refresh_scheduler.async_schedule()
+
+    @callback
+    def _schedule_source_check(self) -> None:
+        """Nächste Prüfung der direkten Datenquelle (kurz nach dem nächsten erwarteten Modelllauf)."""
+        now = now_timestamp()
+        self._unsub_source = async_call_later(
+            self.hass, max(self.source.next_check(now) - now, 1.0), self._handle_source_tick
+        )
+
+    @callback
+    def _handle_source_tick(self, now: datetime) -> None:
+        """Direkte Datenquelle prüfen, neu gerechnet wird nur bei neuen Daten."""
+        self._unsub_source = None
+        self.hass.async_create_task(self._async_check_source())
+
+    async def _async_check_source(self) -> None:
+        try:
+            if await self.source.async_update():
+                self._refresh_scheduler.async_schedule()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            _LOGGER.warning("Open-Meteo nicht erreichbar: %s", err)
+        except Exception:  # pylint: disable=broad-except
+            # Z.B. ungültige Antwort; die nächste Prüfung darf nicht ausfallen
+            _LOGGER.exception("Fehler beim Prüfen der direkten Datenquelle")
+        finally:
+            if self._unsub_upstream is not None:
+                # Noch gestartet (kein async_stop() während des Abrufs)
+                self._schedule_source_check()
+
+    @callback
+    def _schedule_clock_tick(self) -> None:
+        """Nächster Uhrzeit-Tick, sobald sich laut Modell ein uhrzeitabhängiger Wert ändert."""
+        if self._unsub_upstream is None:
+            # Nicht gestartet
+            return
+        if self._unsub_clock is not None:
+            self._unsub_clock()
+        now = now_timestamp()
+        when = next_clock_change(self._inputs) if self._inputs is not None else now + CLOCK_STEP
+        self._unsub_clock = async_call_later(self.hass, max(when - now, 1.0), self._handle_clock_tick)
+
+    @callback
+    def _handle_clock_tick(self, now: datetime) -> None:
+        """
+        Uhrzeit-Tick => nur die uhrzeitabhängigen Werte neu rechnen (bei Stundenreihen
+        zusätzlich die daraus abgeleiteten Stundenwerte).
+        Um Mitternacht zusätzlich die Tages-Slots rotieren (morgen => heute usw.).
+        """
+        self._unsub_clock = None
+        if self.data is None or self._inputs is None:
+            self.hass.async_create_task(self.async_refresh())
+            # Falls der Durchlauf fehlschlägt: nächster Versuch nach CLOCK_STEP
+            self._schedule_clock_tick()
+            return
+        self.stats.begin_cycle()
+        with self.stats.measure("timedif", self.parse_cache):
+            clock = self._read_clock()
+        inputs = {**self._inputs, **clock}
+        if (self.source is not None or self.hourly_series) and self._restore_hold_until is None:
+            # Stundenwerte (current_hour, next_hour, Rest heute) kommen aus den Reihen
+            with self.stats.measure("production", self.parse_cache):
+                self._derive_series(inputs)
+            self._apply_ring(inputs)
+        else:
+            self._ring.apply(self.calendar(clock["now"]).day, inputs, upstream=False)
+        values = compute_changed(inputs, self.data, changed_inputs(self._inputs, inputs), self.stats)
+        self._inputs = inputs
+        self._schedule_clock_tick()
+        self.async_set_updated_data(values)
+
+    def calendar(self, now: float) -> CalendarIndex:
+        """Stunden-Kalender für den Tag von 'now' (einmal pro Tag aufgebaut)."""
+        if self._calendar is None or not self._calendar.covers(now):
+            tz = dt_util.get_time_zone(self.hass.config.time_zone) or dt_util.DEFAULT_TIME_ZONE
+            self._calendar = CalendarIndex.for_timestamp(tz, now)
+        return self._calendar
+
+    def _read_clock(self) -> dict:
+        """Uhrzeitabhängige Eingänge."""
+        now = now_timestamp()
+        calendar = self.calendar(now)
+        return {
+            "now": now,
+            "midnight": calendar.midnight,
+            "hour_start": calendar.hour_start(now),
+            "day_hours": calendar.day_hours,
+        }
+
+    def _read_inputs(self) -> dict:
+        """Liest alle benötigten Upstream-Sensoren aus dem State-Machine."""
+        config = self.config
+        cache = self.parse_cache
+        float_state = cache.float_state
+        timestamp_state = cache.timestamp_state
+        measure = self.stats.measure
+
+        metrics = self.index.metrics
+
+        def floats(metric):
+            return [float_state(ent) for ent in metrics[metric]]
+
+        inputs = {"string_count": self.index.string_count}
+
+        with measure("peak", cache):
+            inputs["peaktime"] = [float_state(ent, 0.0) for ent in config.get(CONF_PEAKTIME_SENSORS, [])]
+            if self.source is None and not self.hourly_series:
+                inputs["peak_today"] = [timestamp_state(ent) for ent in metrics["peak_today"]]
+                inputs["peak_tomorrow"] = [timestamp_state(ent) for ent in metrics["peak_tomorrow"]]
+
+        with measure("sun", cache):
+            inputs["sun_rising"] = float_state(config.get(CONF_SUN_RISING, SUN_NEXT_RISING))
+            inputs["sun_setting"] = float_state(config.get(CONF_SUN_SETTING, SUN_NEXT_SETTING))
+            inputs["sun_next_rising"] = timestamp_state(SUN_NEXT_RISING) or 0.0
+            inputs["sun_next_setting"] = timestamp_state(SUN_NEXT_SETTING) or 0.0
+
+        with measure("timedif", cache):
+            inputs.update(self._read_clock())
+
+        with measure("reduziert", cache):
+            inputs["energy_reduziert"] = config.get(CONF_ENERGY_REDUZIERT, DEFAULT_ENERGY_REDUZIERT)
+
+        with measure("production", cache):
+            if self.source is not None or self.hourly_series:
+                # Alle Kennzahlen (inkl. Peak-Zeiten) aus einer Reihe je String
+                self._derive_series(inputs)
+            else:
+                inputs["remaining_dif"] = [
+                    (float_state(rem), float_state(nex)) for rem, nex in self.index.remaining_dif
+                ]
+                for metric in ("current_hour", "next_hour", "today_remaining", "today", "tomorrow", "d2", "d3"):
+                    inputs[metric] = floats(metric)
+            if self.source is None:
+                inputs["prod_remain"] = float_state(PROD_REMAIN, 0.0)
+                inputs["hourly_curve"] = None
+
+        return inputs
+
+    def _derive_series(self, inputs: dict) -> None:
+        """Kennzahlen für 'now' aus den Stundenreihen in 'inputs' übernehmen."""
+        strings = self._strings()
+        inputs.update(derive_inputs(strings, self.calendar(inputs["now"]), inputs["now"], CLOCK_STEP))
+        if self.source is not None:
+            # Direkte Datenquelle: eine Reihe je Modulfläche, auch Rest heute gesamt
+            inputs["string_count"] = len(strings)
+            inputs["prod_remain"] = sum(inputs["today_remaining"])
+            # Stundenkurve aller Strings ersetzt die Reduziert-Heuristik
+            inputs["hourly_curve"] = self.source.curve
+
+    def _strings(self) -> list:
+        """Stundenreihen je String (direkte Datenquelle oder Attribute der Tages-Sensoren)."""
+        if self.source is not None:
+            return self.source.series
+        return [self._string_series(ents) for ents in self.index.series]
+
+    def _apply_ring(self, inputs: dict) -> None:
+        """Nach Mitternacht: noch nicht umgesprungene Tageseingänge aus dem Ring."""
+        calendar = self.calendar(inputs["now"])
+        uncovered = frozenset()
+        if self.source is not None or self.hourly_series:
+            # Reihen ohne Daten für ihren Tag gelten als noch nicht umgesprungen
+            uncovered = uncovered_inputs(self._strings(), calendar)
+        self._ring.apply(calendar.day, inputs, uncovered=uncovered)
+
+    def _string_series(self, ents: tuple) -> StringSeries:
+        """Reihe eines Strings, wiederverwendet solange keiner seiner Tages-Sensoren sich geändert hat."""
+        days = [self.parse_cache.series_state(ent) for ent in ents]
+        cached = self._series.get(ents)
+        if cached is None or any(old is not new for old, new in zip(cached[0], days)):
+            cached = (days, StringSeries(days))
+            self._series[ents] = cached
+        return cached[1]
+
+    async def _async_update_data(self) -> dict:
+        """
+        Ein Rechendurchlauf. Neu gerechnet werden nur die Knoten, deren
+        Eingänge sich seit dem letzten Durchlauf geändert haben (z.B. nur
+        das tomorrow-Segment, wenn sich nur die tomorrow-Sensoren ändern).
+        """
+        self.stats.begin_cycle()
+        if self.source is not None:
+            try:
+                await self.source.async_update()
+            except (aiohttp.ClientError, TimeoutError) as err:
+                # Kein Cache-Eintrag, auf den ausgewichen werden kann
+                raise UpdateFailed(f"Open-Meteo: {err}") from err
+        inputs = self._read_inputs()
+        self._apply_ring(inputs)
+
+        if self._restore_hold_until is not None:
+            if not self._upstream_ready() and inputs["now"] < self._restore_hold_until:
+                # Direkt nach dem Start: wiederhergestellten Stand halten
+                self._inputs = {**self._inputs, **{key: inputs[key] for key in CLOCK_INPUTS}}
+                self._schedule_clock_tick()
+                return compute_clock(self._inputs, self.data, self.stats)
+            self._restore_hold_until = None
+
+        if self._inputs is None or self.data is None:
+            values = compute_model(inputs, self.stats)
+        else:
+            values = compute_changed(inputs, self.data, changed_inputs(self._inputs, inputs), self.stats)
+        self._inputs = inputs
+        self._schedule_clock_tick()
+        self._store.async_schedule_save(inputs, values)
+        return values
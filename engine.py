@@ -0,0 +1,41 @@
+"""
+Vektorisierte Forecast-Engine (NumPy).
+
+Berechnet die Time-Diff-Werte und sämtliche Forecast-Buckets für alle
+Horizonte (2..78 h) in einer Array-Operation statt einer if/elif-Kaskade
+pro Sensor.
+"""
+import numpy as np
+
+
+def wrap_hours(hours, day_hours=()) -> np.ndarray:
+    """
+    Umbruch je Horizont: Länge der Tage ab morgen bis zum Tag des Horizonts
+    (24, 48, 72, 96 bei lauter 24-Stunden-Tagen). day_hours => Stunden je Tag
+    ab morgen, fehlende Tage zählen 24 Stunden.
+    """
+    hours = np.asarray(hours, dtype=float)
+    days = np.ceil(hours / 24.0).astype(int)
+    lengths = np.full(max(int(days.max(initial=0)), len(day_hours)), 24.0)
+    lengths[:len(day_hours)] = day_hours
+    return np.concatenate(([0.0], np.cumsum(lengths)))[days]
+
+
+def timedif_vector(day_val: float, hours: np.ndarray, wraps: np.ndarray) -> np.ndarray:
+    """Time-Diff für alle Horizonte: day_val - h, bei < 0 um den Tagesumbruch verschoben."""
+    base = day_val - hours
+    return np.where(base < 0, base + wraps, base)
+
+
+def forecast_vector(t_x: np.ndarray, thresholds, prod: np.ndarray, reduziert) -> np.ndarray:
+    """
+    Forecast-Buckets für alle Horizonte.
+    thresholds => (t1, t2, t3, t4), reduziert => (red01, red02, red03, red04),
+    prod => Tagesproduktion je Horizont.
+    Entspricht der Kaskade tX < t4 / < t3 / < 24 / < t2 / < t1.
+    """
+    t1, t2, t3, t4 = thresholds
+    red01, red02, red03, red04 = reduziert
+    conditions = [t_x < t4, t_x < t3, t_x < 24, t_x < t2, t_x < t1]
+    choices = [0.0, prod * red04, prod * red03, prod * red02, prod * red01]
+    return np.select(conditions, choices, default=0.0)
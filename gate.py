@@ -0,0 +1,53 @@
+"""
+Schreib-Gate für sfdb_-Sensoren.
+
+Verhindert State-Writes, wenn sich der Wert nicht (oder nur innerhalb der
+Toleranz) geändert hat. Mit min_interval wird die Schreibrate begrenzt,
+mit max_interval wird ein unveränderter Wert trotzdem regelmäßig erneut
+geschrieben. Ein geänderter Wert, den min_interval zurückhält, wird über
+'deferred' gemeldet und nach Ablauf nachgeschrieben.
+"""
+
+
+class WriteGate:
+    """Entscheidet pro Sensor, ob ein neuer Wert geschrieben werden muss."""
+
+    def __init__(self, abs_epsilon: float = 0.0, rel_epsilon: float = 0.0,
+                 min_interval: float = 0, max_interval: float = 0):
+        self.abs_epsilon = abs_epsilon
+        self.rel_epsilon = rel_epsilon
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._last_value = None
+        self._last_time = None
+        # Sekunden, bis ein zurückgehaltener geänderter Wert geschrieben werden darf (0 = keiner)
+        self.deferred = 0.0
+
+    def _changed(self, value) -> bool:
+        last = self._last_value
+        if isinstance(value, (int, float)) and isinstance(last, (int, float)):
+            diff = abs(value - last)
+            threshold = max(self.abs_epsilon, self.rel_epsilon * abs(last))
+            if threshold > 0:
+                return diff > threshold
+            return diff != 0
+        return value != last
+
+    def should_write(self, value, now: float) -> bool:
+        """True, wenn 'value' zum Zeitpunkt 'now' (monotonic) geschrieben werden soll."""
+        self.deferred = 0.0
+        if self._last_time is None:
+            return True
+        elapsed = now - self._last_time
+        if elapsed < self.min_interval:
+            if self._changed(value):
+                self.deferred = self.min_interval - elapsed
+            return False
+        if self._changed(value):
+            return True
+        return bool(self.max_interval) and elapsed >= self.max_interval
+
+    def mark_written(self, value, now: float) -> None:
+        """Merkt sich den zuletzt geschriebenen Wert."""
+        self._last_value = value
+        self._last_time = now
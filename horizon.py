@@ -0,0 +1,103 @@
+"""
+Tages-Ringpuffer für den Forecast-Horizont (heute, morgen, d2, d3).
+
+Um Mitternacht wird der Ring rotiert statt neu aufgebaut: das bisherige
+"morgen" wird "heute", d2 wird "morgen" usw. Nur der neue d3-Slot hat
+noch keine Daten und behält bis zum Upstream-Update den letzten d3-Wert.
+
+Die Open-Meteo-Sensoren springen erst einige Zeit nach Mitternacht um.
+Bis dahin liefern sie noch die Werte vom Vortag. Solange ein Upstream-Wert
+noch dem Stand vor der Rotation entspricht (höchstens ROLLOVER_HOLD
+Sekunden), wird der rotierte Wert verwendet. So gibt es um 00:00 keine
+Mischung aus altem und neuem Tag. Bei Stundenreihen gilt zusätzlich ein
+Tag, den die Reihe noch nicht vollständig abdeckt, als nicht umgesprungen.
+"""
+from datetime import date
+
+# Slot => (Production-Eingang, Peak-Eingang oder None)
+SLOT_INPUTS = (
+    ("today", "peak_today"),
+    ("tomorrow", "peak_tomorrow"),
+    ("d2", None),
+    ("d3", None),
+)
+DAY_INPUTS = tuple(key for slot in SLOT_INPUTS for key in slot if key)
+
+# Maximale Haltezeit der rotierten Werte nach Mitternacht (Sekunden)
+ROLLOVER_HOLD = 3 * 3600
+
+
+class DayRing:
+    """Tages-Slots heute..d3 (Production je String, Peak-Zeitpunkte je String)."""
+
+    def __init__(self):
+        self.day = None
+        # Slot => {Eingang: Wert}
+        self._slots = [{} for _slot in SLOT_INPUTS]
+        # Upstream-Stand vor der letzten Rotation (Eingang => Wert) und Ende der Haltezeit
+        self._upstream = {}
+        self._pending = {}
+        self._hold_until = 0.0
+
+    def apply(self, day: date, inputs: dict, upstream: bool = True, uncovered: frozenset = frozenset()) -> dict:
+        """
+        Rotiert bei einem neuen Tag und ersetzt in 'inputs' die Tageseingänge,
+        die upstream noch nicht umgesprungen sind. Ändert 'inputs' in place.
+        upstream=False: 'inputs' enthält die Modell-Eingänge des letzten
+        Durchlaufs (Uhrzeit-Tick), nicht frisch gelesene Upstream-Werte.
+        uncovered => Tageseingänge, deren Tag die Stundenreihen nicht vollständig abdecken.
+        """
+        if self.day is not None and day != self.day:
+            self._rotate((day - self.day).days, inputs["now"])
+        self.day = day
+
+        if self._pending and inputs["now"] >= self._hold_until:
+            self._pending.clear()
+        if upstream:
+            fresh = {key: inputs[key] for key in DAY_INPUTS}
+            for key in list(self._pending):
+                if key in uncovered or fresh[key] == self._pending[key]:
+                    # Upstream noch vom Vortag bzw. ohne Daten => rotierter Wert
+                    inputs[key] = self._value(key)
+                else:
+                    del self._pending[key]
+            self._upstream = fresh
+        else:
+            for key in self._pending:
+                inputs[key] = self._value(key)
+
+        for slot, keys in zip(self._slots, SLOT_INPUTS):
+            for key in keys:
+                if key:
+                    slot[key] = inputs[key]
+        return inputs
+
+    def _value(self, key: str):
+        for slot, keys in zip(self._slots, SLOT_INPUTS):
+            if key in keys:
+                return slot[key]
+        raise KeyError(key)
+
+    def _rotate(self, shift: int, now: float) -> None:
+        """Slots um 'shift' Tage verschieben (O(1) je Slot)."""
+        if not 0 < shift < len(SLOT_INPUTS) or not self._slots[-1]:
+            # Rückwärts, zu weit oder noch leer => nicht rotieren, Upstream gilt
+            self._pending.clear()
+            return
+        old = self._slots
+        last = len(old) - 1
+        self._slots = []
+        for index, (prod_key, peak_key) in enumerate(SLOT_INPUTS):
+            source = index + shift
+            slot = {prod_key: old[min(source, last)][SLOT_INPUTS[min(source, last)][0]]}
+            if peak_key:
+                if source <= 1:
+                    slot[peak_key] = old[source][SLOT_INPUTS[source][1]]
+                else:
+                    # Kein Peak bekannt => Peak von morgen um die Tage verschoben
+                    offset = (source - 1) * 86400
+                    slot[peak_key] = [ts + offset if ts is not None else None
+                                      for ts in old[1]["peak_tomorrow"]]
+            self._slots.append(slot)
+        self._pending = dict(self._upstream)
+        self._hold_until = now + ROLLOVER_HOLD
@@ -0,0 +1,451 @@
+"""
+Rechenmodell für sämtliche sfdb_-Werte.
+
+Alle abgeleiteten Werte werden hier in einem einzigen Durchlauf aus den
+Eingangswerten (Open-Meteo-Sensoren, Sun, Config) berechnet. Zwischenwerte
+werden - wie früher beim Zurücklesen aus dem State-Machine - gerundet
+weiterverwendet, damit die Ergebnisse identisch zu den alten Einzelsensoren sind.
+
+Jeder Wert ist ein Knoten mit expliziten Abhängigkeiten. Die Sensor-Knoten
+entstehen aus der Tabelle in spec.py, Sonderfälle und interne Zwischenwerte
+sind hier als Funktion hinterlegt. Die Knoten werden
+einmalig topologisch sortiert und dann in dieser Reihenfolge im Speicher
+ausgewertet, so dass eine Änderung am Eingang in einem Durchlauf
+vollständig durch die Kette läuft.
+"""
+import math
+import time
+from functools import lru_cache
+from graphlib import TopologicalSorter
+
+import numpy as np
+
+from . import engine
+# Sensor-Tabelle und Horizonte
+from .spec import (
+    SENSOR_SPECS,
+    FORECAST_DAYS,
+    HORIZON_HOURS,
+    TIMEDIF_HOURS,
+)
+
+
+def node_family(key: str) -> str:
+    """Sensor-Familie eines Wertes (peak, sun, timedif, reduziert, production, forecast)."""
+    key = key.lower().lstrip("_")
+    if "timedif" in key:
+        return "timedif"
+    if "reduziert" in key:
+        return "reduziert"
+    if "sun" in key:
+        return "sun"
+    if "peak" in key:
+        return "peak"
+    if "production" in key or "hour_sum" in key or "prod_remain" in key:
+        return "production"
+    return "forecast"
+
+
+def _sum_positive(values) -> float:
+    """Summe mehrerer Strings, negative Summen werden auf 0 gesetzt."""
+    base = sum(values)
+    if base < 0:
+        base = 0
+    return round(base, 2)
+
+
+# ------------------------------------------------------------------------------
+# Abhängigkeitsgraph
+# ------------------------------------------------------------------------------
+
+# object_id => (Abhängigkeiten, Funktion(inputs, values))
+NODES = {}
+
+# object_id => direkt gelesene Eingänge (Schlüssel in inputs)
+READS = {}
+
+# Eingänge, die sich nur durch die Uhrzeit ändern ("day_hours" = Stunden je Tag heute..d4)
+CLOCK_INPUTS = ("now", "midnight", "hour_start", "day_hours")
+
+# Auflösung der Stunden bis Mitternacht (0.1 h) => Abstand der Uhrzeit-Ticks in Sekunden
+CLOCK_STEP = 360
+
+
+def _node(key: str, *deps: str, reads: tuple = ()):
+    """Registriert eine Ableitung mit ihren Abhängigkeiten und den gelesenen Eingängen."""
+    def register(func):
+        NODES[key] = (deps, func)
+        READS[key] = frozenset(reads)
+        return func
+    return register
+
+
+def _mid_hours(inputs: dict) -> int:
+    return int(inputs["midnight"] / 3600)
+
+
+def _day_end(inputs: dict) -> float:
+    """Ende des lokalen Tages (nächste Mitternacht, Unix-Time)."""
+    return inputs["midnight"] + inputs["day_hours"][0] * 3600
+
+
+#
+# (1) PEAK-TIME
+#
+@_node("sfdb_peak_time_average", reads=("peaktime",))
+def _peak_time_average(inputs, v):
+    peaks = inputs["peaktime"]
+    return round(sum(peaks) / len(peaks), 2) if peaks else 0
+
+
+#
+# (2) High Peak Time (Today, Tomorrow), TimeDiff Today
+#
+@_node("sfdb_power_highest_peak_time_today_sum_day", reads=("now", "midnight", "day_hours"))
+def _peak_today_sum_day(inputs, v):
+    # Stunden bis Mitternacht (auch an 23/25-Stunden-Tagen)
+    return round((_day_end(inputs) - inputs["now"]) / 3600, 1)
+
+
+def _register_peak(day: str):
+    @_node(f"sfdb_power_highest_peak_time_{day}_sum_dif", reads=("now", f"peak_{day}", "string_count"))
+    def _peak_sum_dif(inputs, v):
+        now_ts = inputs["now"]
+        total = sum(int((now_ts - ts) / 3600.0 * -1) for ts in inputs[f"peak_{day}"] if ts is not None)
+        return round(total / max(inputs["string_count"], 1), 1)
+
+    @_node(f"sfdb_power_highest_peak_time_{day}_sum", reads=(f"peak_{day}",))
+    def _peak_sum(inputs, v):
+        hours = [int(ts / 3600) for ts in inputs[f"peak_{day}"] if ts is not None]
+        return round(sum(hours) / len(hours), 1) if hours else 0
+
+
+_register_peak("today")
+_register_peak("tomorrow")
+
+
+@_node("sfdb_energy_timedif_today", "sfdb_power_highest_peak_time_today_sum", reads=("midnight", "day_hours"))
+def _timedif_today(inputs, v):
+    peak_sum = v["sfdb_power_highest_peak_time_today_sum"]
+    return round(inputs["day_hours"][0] - (peak_sum - _mid_hours(inputs) - 2), 1)
+
+
+@_node("sfdb_energy_timedif_tomorrow", "sfdb_power_highest_peak_time_tomorrow_sum",
+       reads=("midnight", "day_hours"))
+def _timedif_tomorrow(inputs, v):
+    peak_sum = v["sfdb_power_highest_peak_time_tomorrow_sum"]
+    return round(sum(inputs["day_hours"][:2]) - (peak_sum - _mid_hours(inputs) - 2), 1)
+
+
+#
+# (3) Time-Diff-Vektor (01h..78h)
+#
+_TIMEDIF_HOURS = np.array(TIMEDIF_HOURS, dtype=float)
+
+
+@lru_cache(maxsize=8)
+def _timedif_wraps(day_hours: tuple) -> np.ndarray:
+    """Umbruch je Time-Diff-Horizont aus den Tageslängen ab morgen."""
+    return engine.wrap_hours(TIMEDIF_HOURS, day_hours[1:])
+
+
+@_node("_timedif_vector", "sfdb_power_highest_peak_time_today_sum_day", reads=("day_hours",))
+def _timedif_vector(inputs, v):
+    return engine.timedif_vector(v["sfdb_power_highest_peak_time_today_sum_day"],
+                                 _TIMEDIF_HOURS, _timedif_wraps(tuple(inputs["day_hours"])))
+
+
+#
+# (4) energy_reduziert_01_sum .. 04_sum
+#
+_REDUZIERT_DEPS = ("sfdb_power_sun_rising_time_today_sum_dif",
+                   "sfdb_power_sun_setting_time_today_sum_dif")
+
+
+def _rising_setting(v):
+    return (v["sfdb_power_sun_rising_time_today_sum_dif"],
+            v["sfdb_power_sun_setting_time_today_sum_dif"])
+
+
+@_node("sfdb_energy_reduziert_01_sum", "sfdb_energy_reduziert", *_REDUZIERT_DEPS)
+def _reduziert_01(inputs, v):
+    r, s = _rising_setting(v)
+    total = r + r + s + s
+    if r == 0 or total == 0:
+        return 0
+    return round(((r / total) * v["sfdb_energy_reduziert"]) / r, 2)
+
+
+@_node("sfdb_energy_reduziert_02_sum", "sfdb_energy_reduziert_01_sum", *_REDUZIERT_DEPS)
+def _reduziert_02(inputs, v):
+    r, s = _rising_setting(v)
+    denom = r + s
+    if r == 0 or denom == 0:
+        return 0
+    return round(((r / denom) - v["sfdb_energy_reduziert_01_sum"]) / r, 2)
+
+
+@_node("sfdb_energy_reduziert_03_sum", "sfdb_energy_reduziert_04_sum", *_REDUZIERT_DEPS)
+def _reduziert_03(inputs, v):
+    r, s = _rising_setting(v)
+    denom = s + r
+    if s == 0 or denom == 0:
+        return 0
+    return round(((s / denom) - v["sfdb_energy_reduziert_04_sum"]) / s, 2)
+
+
+@_node("sfdb_energy_reduziert_04_sum", "sfdb_energy_reduziert", *_REDUZIERT_DEPS)
+def _reduziert_04(inputs, v):
+    r, s = _rising_setting(v)
+    total = r + r + s + s
+    if s == 0 or total == 0:
+        return 0
+    return round(((s / total) * v["sfdb_energy_reduziert"]) / s, 2)
+
+
+#
+# (5) Production
+#
+@_node("sfdb_energy_production_today_remaining_sum_dif", reads=("remaining_dif",))
+def _today_remaining_sum_dif(inputs, v):
+    return round(sum(rem - nex for rem, nex in inputs["remaining_dif"]), 1)
+
+
+#
+# (7) Forecast-Segmente je Tag (today / tomorrow / d2 / d3) + Gesamtvektor
+#     Ein Segment hängt nur von der Production-SUM seines Tages ab; eine
+#     Änderung an z.B. tomorrow rechnet nur das tomorrow-Segment neu.
+#     Mit Stundenkurve (direkte Datenquelle, Eingang "hourly_curve") kommen
+#     die Werte direkt aus der Kurve statt aus der Reduziert-Heuristik.
+#
+_FORECAST_SHARED = ("_timedif_vector",
+                    *(f"sfdb_energy_timedif_{i}" for i in range(1, 5)),
+                    *(f"sfdb_energy_reduziert_{i:02d}_sum" for i in range(1, 5)))
+
+
+def forecast_segment(day: str) -> str:
+    """Knoten des Forecast-Segments eines Tages."""
+    return f"_forecast_{day}"
+
+
+def _curve_segment(curve: dict, hour_start: float, offsets: np.ndarray) -> np.ndarray:
+    """kWh der Stunden hour_start + offsets aus der Stundenkurve, außerhalb 0."""
+    values = np.asarray(curve["values"], dtype=float)
+    positions = offsets + int((hour_start - curve["start"]) // 3600)
+    valid = (positions >= 0) & (positions < len(values))
+    segment = np.zeros(len(offsets))
+    segment[valid] = values[positions[valid]]
+    return segment
+
+
+def _register_segment(day: str, hours: list, prod_key: str):
+    timedif_index = np.array([TIMEDIF_HOURS.index(hour) for hour in hours])
+    offsets = np.array(hours)
+
+    @_node(forecast_segment(day), prod_key, *_FORECAST_SHARED, reads=("hourly_curve", "hour_start"))
+    def _segment(inputs, v):
+        if inputs.get("hourly_curve"):
+            return _curve_segment(inputs["hourly_curve"], inputs["hour_start"], offsets)
+        return engine.forecast_vector(
+            v["_timedif_vector"][timedif_index],
+            tuple(v[f"sfdb_energy_timedif_{i}"] for i in range(1, 5)),
+            np.full(len(hours), v[prod_key], dtype=float),
+            tuple(v[f"sfdb_energy_reduziert_{i:02d}_sum"] for i in range(1, 5)),
+        )
+
+
+for _day, _hours, _prod_key in FORECAST_DAYS:
+    _register_segment(_day, _hours, _prod_key)
+
+_SEGMENTS = tuple(forecast_segment(day) for day, _hours, _prod in FORECAST_DAYS)
+
+
+@_node("_forecast_vector", *_SEGMENTS)
+def _forecast_vector(inputs, v):
+    return np.concatenate([v[segment] for segment in _SEGMENTS])
+
+
+#
+# (7e) Forecast-Kurve => alle Horizonte als Zeitstempel/Wert-Arrays
+#
+@_node("_curve", "_forecast_vector", "sfdb_energy_current_hour_sum", "sfdb_energy_next_hour_sum",
+       reads=("hour_start",))
+def _curve(inputs, v):
+    hour_start = inputs["hour_start"]
+    hours = [0, 1] + HORIZON_HOURS
+    values = [v["sfdb_energy_current_hour_sum"], v["sfdb_energy_next_hour_sum"]]
+    values += [round(val, 1) for val in v["_forecast_vector"].tolist()]
+    return {
+        "timestamps": [hour_start + hour * 3600 for hour in hours],
+        "values": values,
+    }
+
+
+#
+# (7f) Marker für Graph/HTTP-View => Peak, Sonnenaufgang, Sonnenuntergang (Unix-Time)
+#
+@_node("_markers", "sfdb_power_highest_peak_time_today_sum", "sfdb_power_highest_peak_time_tomorrow_sum",
+       reads=("sun_next_rising", "sun_next_setting"))
+def _markers(inputs, v):
+    return {
+        "peak_today": v["sfdb_power_highest_peak_time_today_sum"] * 3600,
+        "peak_tomorrow": v["sfdb_power_highest_peak_time_tomorrow_sum"] * 3600,
+        "sunrise": inputs["sun_next_rising"],
+        "sunset": inputs["sun_next_setting"],
+    }
+
+
+# ------------------------------------------------------------------------------
+# Knoten aus der Sensor-Tabelle (spec.py)
+# ------------------------------------------------------------------------------
+def _spec_node(spec) -> None:
+    """Registriert den Knoten einer Tabellenzeile (Formel-Art siehe spec.py)."""
+    key = spec.name.lower()
+    kind, params = spec.kind, spec.params
+    if kind == "node":
+        if key not in NODES:
+            raise ValueError(f"Kein Knoten für {spec.name}")
+        return
+
+    if kind in ("round", "hour", "sum_positive"):
+        (name,) = spec.inputs
+        if kind == "round":
+            def func(inputs, v):
+                return round(inputs[name], params[0])
+        elif kind == "hour":
+            def func(inputs, v):
+                return round(int(inputs[name] / 3600), 1)
+        else:
+            def func(inputs, v):
+                return _sum_positive(inputs[name])
+        _node(key, reads=(name,))(func)
+        return
+
+    deps = tuple(dep.lower() for dep in spec.inputs)
+    if kind == "linear":
+        (first_sign, first), rest = (params[0], deps[0]), tuple(zip(params[1:-1], deps[1:]))
+        ndigits = params[-1]
+
+        def func(inputs, v):
+            val = first_sign * v[first]
+            for sign, dep in rest:
+                val += sign * v[dep]
+            return round(val, ndigits)
+    elif kind == "half_wrap":
+        lower, upper = params
+
+        def func(inputs, v):
+            z = v[deps[0]]
+            if z < lower:
+                z += 24
+            elif z > upper:
+                z -= 24
+            return round(z / 2.0, 1)
+    elif kind == "index":
+        index, ndigits = params
+
+        def func(inputs, v):
+            return round(float(v[deps[0]][index]), ndigits)
+    elif kind == "copy":
+        def func(inputs, v):
+            return v[deps[0]]
+    else:
+        raise ValueError(f"Unbekannte Formel-Art {kind!r} für {spec.name}")
+    _node(key, *dict.fromkeys(deps))(func)
+
+
+for _spec in SENSOR_SPECS:
+    _spec_node(_spec)
+
+
+# Einmalig berechnete Auswertungsreihenfolge (wirft CycleError bei Zyklen)
+EVAL_ORDER = tuple(TopologicalSorter({key: deps for key, (deps, _f) in NODES.items()}).static_order())
+
+
+# Familie je Knoten in Auswertungsreihenfolge (für die Laufzeit-Statistik)
+EVAL_FAMILIES = tuple(node_family(key) for key in EVAL_ORDER)
+
+
+@lru_cache(maxsize=64)
+def _affected(changed: frozenset) -> tuple:
+    """(Knoten, Familien) in Auswertungsreihenfolge, die von 'changed' (Eingänge) abhängen."""
+    dirty = set()
+    for key in EVAL_ORDER:
+        if READS[key] & changed or any(dep in dirty for dep in NODES[key][0]):
+            dirty.add(key)
+    order = tuple(key for key in EVAL_ORDER if key in dirty)
+    return order, tuple(node_family(key) for key in order)
+
+
+# Alle Knoten, die (auch indirekt) von der Uhrzeit abhängen, in Auswertungsreihenfolge
+CLOCK_ORDER, CLOCK_FAMILIES = _affected(frozenset(CLOCK_INPUTS))
+
+
+def _evaluate(order, families, inputs: dict, values: dict, stats) -> dict:
+    """Wertet die Knoten aus 'order' in 'values' aus."""
+    if stats is None:
+        for key in order:
+            values[key] = NODES[key][1](inputs, values)
+        return values
+
+    clock = time.perf_counter
+    elapsed = dict.fromkeys(families, 0.0)
+    last = clock()
+    for key, family in zip(order, families):
+        values[key] = NODES[key][1](inputs, values)
+        now = clock()
+        elapsed[family] += now - last
+        last = now
+    for family, seconds in elapsed.items():
+        stats.add_time(family, seconds)
+    return values
+
+
+def compute_model(inputs: dict, stats=None) -> dict:
+    """
+    Berechnet alle sfdb_-Werte in einem Durchlauf (topologische Reihenfolge).
+    Rückgabe: dict object_id (lowercase) => Wert. Schlüssel mit führendem
+    "_" sind interne Zwischenwerte (z.B. NumPy-Vektoren) und keine Sensoren.
+    Mit 'stats' (UpdateStats) wird die Rechenzeit je Familie erfasst.
+    """
+    return _evaluate(EVAL_ORDER, EVAL_FAMILIES, inputs, {}, stats)
+
+
+def compute_clock(inputs: dict, previous: dict, stats=None) -> dict:
+    """
+    Nur der uhrzeitabhängige Teil (CLOCK_ORDER) neu, alle übrigen Werte
+    kommen unverändert aus 'previous' (Stunden-/Mitternachtswechsel).
+    """
+    return _evaluate(CLOCK_ORDER, CLOCK_FAMILIES, inputs, dict(previous), stats)
+
+
+def compute_changed(inputs: dict, previous: dict, changed, stats=None) -> dict:
+    """
+    Nur die Knoten neu, die von den Eingängen 'changed' abhängen; alle
+    übrigen Werte kommen unverändert aus 'previous'.
+    """
+    order, families = _affected(frozenset(changed))
+    return _evaluate(order, families, inputs, dict(previous), stats)
+
+
+def _next_crossing(anchor: float, now: float, step: float) -> float:
+    """Erster Zeitpunkt nach 'now' der Form anchor - k * step."""
+    return anchor - step * (math.ceil((anchor - now) / step) - 1)
+
+
+def next_clock_change(inputs: dict) -> float:
+    """
+    Nächster Zeitpunkt (Unix-Time), an dem sich ein uhrzeitabhängiger Wert ändert:
+    der nächste 0.1-h-Schritt bis Mitternacht (schließt volle Stunde und Mitternacht ein)
+    oder ein Peak-Abstand (*_sum_dif), der eine volle Stunde überschreitet.
+    """
+    now = inputs["now"]
+    changes = [_next_crossing(_day_end(inputs), now, CLOCK_STEP)]
+    for day in ("today", "tomorrow"):
+        changes += [_next_crossing(ts, now, 3600) for ts in inputs.get(f"peak_{day}") or () if ts is not None]
+    return min(changes)
+
+
+def changed_inputs(previous: dict, inputs: dict) -> frozenset:
+    """Eingänge, deren Wert sich gegenüber 'previous' geändert hat."""
+    return frozenset(key for key, val in inputs.items() if previous.get(key) != val)
@@ -0,0 +1,428 @@
+"""
+Direkte Datenquelle: Open-Meteo Forecast-API (optional).
+
+Statt der Sensoren der Open-Meteo-Solar-Forecast-Integration wird die
+Einstrahlung (GHI / DNI / DHI) direkt abgerufen, über die gemeinsame
+aiohttp-Session von Home Assistant. Alle Flächen teilen sich einen Request
+(Standorte kommagetrennt); die spaltenweise Antwort wird in einem Durchgang
+auf die Modulflächen umgerechnet (transposition.py). Die Summe aller Strings
+je Stunde ersetzt im Modell die Reduziert-Heuristik als Stundenkurve.
+
+Antworten landen in einem Cache auf der Platte (helpers.storage.Store),
+Schlüssel: Standort + Parameter + Modelllauf. Bei Modellen mit meta.json
+wird erst nach dem nächsten erwarteten Lauf nachgefragt; gibt es keinen
+neuen Lauf, entfallen Download und Neuberechnung. Sonst gilt ein Eintrag
+CACHE_MAX_AGE Sekunden. In beiden Fällen gibt es beim Start mit frischem
+Cache keinen Request; nachgefragt wird bedingt (If-None-Match / If-Modified-Since).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import NamedTuple
+
+import aiohttp
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .series import EMPTY, HourlySeries, StringSeries
+from .transposition import plane_power
+
+_LOGGER = logging.getLogger(__name__)
+
+API_URL = "https://api.open-meteo.com"
+FORECAST_PATH = "/v1/forecast"
+META_PATH = "/data/{model}/static/meta.json"
+# Heute..d3 plus ein Tag Reserve, dazu der Vortag: die Zeitachse ist UTC (ab 00:00 UTC
+# des ersten Tages), der lokale Tag beginnt östlich von UTC schon am Vortag bzw. reicht
+# westlich von UTC in den nächsten UTC-Tag. Der Horizont reicht bis 78 h nach der lokalen Stunde.
+FORECAST_DAYS = 5
+PAST_DAYS = 1
+HOURLY_VARIABLES = ("shortwave_radiation", "direct_normal_irradiance", "diffuse_radiation")
+# Sekunden, die eine Antwort ohne Nachfrage gilt (Open-Meteo rechnet höchstens stündlich neu)
+CACHE_MAX_AGE = 900
+REQUEST_TIMEOUT = 30
+# Sekunden nach der erwarteten Verfügbarkeit eines Laufs, bis nachgefragt wird
+RUN_MARGIN = 300
+# Sekunden zwischen zwei Nachfragen, solange der erwartete Lauf noch fehlt
+RUN_RETRY = 600
+
+# Wettermodell (Parameter "models") => Name in /data/{model}/static/meta.json.
+# "best_match" mischt mehrere Modelle und hat keine Laufinfo => Abruf nach CACHE_MAX_AGE.
+DEFAULT_MODEL = "best_match"
+META_MODELS = {
+    "icon_d2": "dwd_icon_d2",
+    "icon_eu": "dwd_icon_eu",
+    "icon_global": "dwd_icon",
+    "ecmwf_ifs025": "ecmwf_ifs025",
+}
+# Verluste (Wechselrichter, Leitungen, Temperatur) pauschal
+PERFORMANCE_RATIO = 0.85
+
+STORAGE_VERSION = 1
+# Sekunden, die Schreibvorgänge des Caches zusammengefasst werden
+SAVE_DELAY = 10
+
+
+class Plane(NamedTuple):
+    """
+    Modulfläche eines Strings. Azimut wie Open-Meteo: 0 = Süd, -90 = Ost, 90 = West.
+    Ohne latitude/longitude gilt der Standort des Config Entries.
+    """
+    tilt: float
+    azimuth: float
+    kwp: float
+    latitude: float = None
+    longitude: float = None
+
+
+class Batch(NamedTuple):
+    """
+    Ein Request für mehrere Flächen, Standorte kommagetrennt.
+    members => (Index der Fläche, Index des Standorts im Request) je Fläche,
+    locations => (Breite, Länge) je Standort in Request-Reihenfolge.
+    """
+    params: dict
+    members: tuple
+    locations: tuple
+
+
+def parse_planes(text: str) -> list:
+    """
+    '30/0/5.0, 30/-90/3.2@48.14/11.58' => [Plane(30, 0, 5.0), Plane(30, -90, 3.2, 48.14, 11.58)],
+    ValueError bei Fehlern.
+    """
+    planes = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        plane, _sep, location = part.partition("@")
+        tilt, azimuth, kwp = (float(val) for val in plane.split("/"))
+        if location:
+            latitude, longitude = (float(val) for val in location.split("/"))
+            planes.append(Plane(tilt, azimuth, kwp, latitude, longitude))
+        else:
+            planes.append(Plane(tilt, azimuth, kwp))
+    return planes
+
+
+def format_planes(planes) -> str:
+    """[Plane(30, 0, 5.0), Plane(30, 0, 5.0, 48.14, 11.58)] => '30/0/5, 30/0/5@48.14/11.58'"""
+    parts = []
+    for plane in planes:
+        plane = Plane(*plane)
+        part = f"{plane.tilt:g}/{plane.azimuth:g}/{plane.kwp:g}"
+        if plane.latitude is not None:
+            part += f"@{plane.latitude:g}/{plane.longitude:g}"
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def batch_requests(latitude: float, longitude: float, planes, model: str = DEFAULT_MODEL) -> list:
+    """
+    Flächen => ein Request. Abgefragt werden GHI / DNI / DHI (unabhängig von
+    Neigung und Azimut), jeder Standort einmal, kommagetrennt; die Umrechnung
+    auf die Modulflächen macht transposition.plane_power().
+    """
+    locations = {}
+    members = []
+    for index, plane in enumerate(planes):
+        location = (
+            plane.latitude if plane.latitude is not None else latitude,
+            plane.longitude if plane.longitude is not None else longitude,
+        )
+        members.append((index, locations.setdefault(location, len(locations))))
+    if not members:
+        return []
+
+    params = {
+        "latitude": ",".join(f"{lat:.4f}" for lat, _lon in locations),
+        "longitude": ",".join(f"{lon:.4f}" for _lat, lon in locations),
+        "hourly": ",".join(HOURLY_VARIABLES),
+        "forecast_days": str(FORECAST_DAYS),
+        "past_days": str(PAST_DAYS),
+        "timeformat": "unixtime",
+        "timezone": "GMT",
+    }
+    if model != DEFAULT_MODEL:
+        params["models"] = model
+    return [Batch(params, tuple(members), tuple(locations))]
+
+
+def cache_key(params: dict, model_run=None) -> str:
+    """Standort + Parameter + Modelllauf => Cache-Schlüssel."""
+    raw = json.dumps([params, model_run], sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def meta_key(model: str) -> str:
+    """Cache-Schlüssel der meta.json eines Modells."""
+    return f"meta:{model}"
+
+
+def split_batch(body, batch: Batch, planes) -> dict:
+    """
+    Antwort eines Batches => {Index der Fläche: StringSeries} (Wh je Stunde, W als Leistung).
+    Mehrere Standorte kommen als Liste, einer als Objekt. Die Spalten werden
+    als Arrays (Standorte x Stunden) übernommen und für alle Flächen in einem
+    Durchgang auf die Modulebene umgerechnet. Open-Meteo liefert Strahlungswerte
+    als Mittel der vorangehenden Stunde, der Zeitstempel ist also das Stundenende.
+    """
+    locations = body if isinstance(body, list) else [body]
+    hourly = [location.get("hourly") or {} for location in locations]
+    times = hourly[0].get("time") if hourly else None
+    if (not times or len(hourly) != len(batch.locations)
+            or any(not column.get(var) for column in hourly for var in HOURLY_VARIABLES)):
+        return {index: StringSeries([(EMPTY, EMPTY)]) for index, _location in batch.members}
+    ends = np.asarray(times, dtype=float)
+    # None (fehlende Werte) => nan => 0
+    ghi, dni, dhi = (
+        np.nan_to_num(np.array([column[var] for column in hourly], dtype=float)) for var in HOURLY_VARIABLES
+    )
+    indexes = [index for index, _location in batch.members]
+    power = plane_power(
+        ends - 1800,
+        [lat for lat, _lon in batch.locations],
+        [lon for _lat, lon in batch.locations],
+        ghi, dni, dhi,
+        [location for _index, location in batch.members],
+        [planes[index].tilt for index in indexes],
+        [planes[index].azimuth for index in indexes],
+        [planes[index].kwp for index in indexes],
+        PERFORMANCE_RATIO,
+    )
+
+    starts = ends - 3600
+    series = {}
+    for row, index in enumerate(indexes):
+        watts = HourlySeries(starts, power[row])
+        series[index] = StringSeries([(watts, watts)])
+    return series
+
+
+def hourly_curve(series):
+    """
+    Reihen aller Strings => Summe je Stunde in kWh (gerundet, JSON-tauglich) oder None.
+    Alle Reihen kommen aus derselben Antwort und haben dieselbe Zeitachse.
+    """
+    rows = [string.energy for string in series if len(string.energy.starts)]
+    if not rows:
+        return None
+    total = np.sum([row.values for row in rows], axis=0) / 1000.0
+    return {"start": float(rows[0].starts[0]), "values": np.round(total, 3).tolist()}
+
+
+class ResponseCache:
+    """Antworten je Cache-Schlüssel: {body, etag, last_modified, fetched_at}."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.openmeteo")
+        self._entries = None
+
+    async def async_load(self) -> None:
+        if self._entries is None:
+            self._entries = await self._store.async_load() or {}
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def put(self, key: str, entry: dict) -> None:
+        self._entries[key] = entry
+        self._schedule_save()
+
+    def retain(self, keys) -> None:
+        """Einträge verwerfen, die nicht mehr abgefragt werden (alter Modelllauf, andere Fläche)."""
+        if self._entries is None:
+            return
+        stale = set(self._entries) - set(keys)
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(lambda: self._entries, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+class ModelRun(NamedTuple):
+    """Letzter Lauf eines Wettermodells laut meta.json (Unix-Zeit / Sekunden)."""
+    initialisation: float
+    availability: float
+    interval: float
+
+    def next_expected(self) -> float:
+        """Frühester Zeitpunkt, zu dem der nächste Lauf abrufbar sein sollte."""
+        return self.availability + self.interval + RUN_MARGIN
+
+
+def parse_model_run(body):
+    """meta.json => ModelRun, sonst None."""
+    try:
+        return ModelRun(
+            float(body["last_run_initialisation_time"]),
+            float(body["last_run_availability_time"]),
+            float(body["update_interval_seconds"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class OpenMeteoClient:
+    """HTTP-Client mit Cache und bedingten Requests."""
+
+    def __init__(self, session: aiohttp.ClientSession, cache: ResponseCache, url: str = API_URL):
+        self._session = session
+        self._cache = cache
+        self._url = url
+        # Anzahl HTTP-Requests (für Statistik / Benchmark)
+        self.requests = 0
+
+    async def async_fetch(self, params: dict, model_run=None, now: float = None):
+        """
+        Antwort für 'params'. Mit Modelllauf gilt ein Cache-Eintrag, bis es
+        einen neuen Lauf gibt; ohne, solange er jünger als CACHE_MAX_AGE ist.
+        Sonst bedingter Request. Bei Fehlern wird ein vorhandener, älterer
+        Eintrag weiterverwendet.
+        """
+        await self._cache.async_load()
+        now = time.time() if now is None else now
+        key = cache_key(params, model_run)
+        entry = self._cache.get(key)
+        if entry is not None and (model_run is not None or now - entry["fetched_at"] < CACHE_MAX_AGE):
+            return entry["body"]
+        return await self._async_request(key, f"{self._url}{FORECAST_PATH}", params, entry, now)
+
+    async def async_model_run(self, model: str, now: float = None):
+        """
+        Letzter Lauf von 'model' (Name wie in /data/{model}/static/meta.json).
+        Nachgefragt wird erst, wenn der nächste Lauf fällig ist, danach höchstens
+        alle RUN_RETRY Sekunden.
+        """
+        await self._cache.async_load()
+        now = time.time() if now is None else now
+        key = meta_key(model)
+        entry = self._cache.get(key)
+        if entry is not None:
+            run = parse_model_run(entry["body"])
+            if run is not None and (now < run.next_expected() or now - entry["fetched_at"] < RUN_RETRY):
+                return run
+        body = await self._async_request(key, f"{self._url}{META_PATH.format(model=model)}", None, entry, now)
+        return parse_model_run(body)
+
+    async def _async_request(self, key: str, url: str, params, entry, now: float):
+        """GET mit If-None-Match / If-Modified-Since, Antwort landet im Cache unter 'key'."""
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        self.requests += 1
+        try:
+            async with self._session.get(
+                url, params=params, headers=headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as resp:
+                if resp.status == 304 and entry is not None:
+                    self._cache.put(key, {**entry, "fetched_at": now})
+                    return entry["body"]
+                resp.raise_for_status()
+                body = await resp.json()
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except (aiohttp.ClientError, TimeoutError) as err:
+            if entry is None:
+                raise
+            _LOGGER.warning("Open-Meteo nicht erreichbar (%s), verwende Stand von %s", err, entry["fetched_at"])
+            return entry["body"]
+
+        self._cache.put(key, {"body": body, "etag": etag, "last_modified": last_modified, "fetched_at": now})
+        return body
+
+
+class OpenMeteoSource:
+    """Direkte Datenquelle eines Config Entries: eine Stundenreihe je Modulfläche."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, latitude: float, longitude: float, planes,
+                 model: str = DEFAULT_MODEL, url: str = API_URL):
+        self.planes = list(planes)
+        self.model = model
+        self._batches = batch_requests(latitude, longitude, self.planes, model)
+        self.cache = ResponseCache(hass, entry_id)
+        self.client = OpenMeteoClient(async_get_clientsession(hass), self.cache, url)
+        # Letzter bekannter Modelllauf (None => Modell ohne meta.json, Abruf nach CACHE_MAX_AGE)
+        self.model_run = None
+        # Letzte Antwort je Batch, ihr Cache-Schlüssel und die daraus gebauten Reihen
+        # (neu nur bei neuer Antwort)
+        self._bodies = [None] * len(self._batches)
+        self._keys = [None] * len(self._batches)
+        self.series = [StringSeries([(EMPTY, EMPTY)]) for _plane in self.planes]
+        # Summe aller Strings je Stunde (kWh): {"start": Beginn der ersten Stunde, "values": [...]}
+        self.curve = None
+        # Prüfung (Timer) und Rechendurchlauf rufen async_update() unabhängig voneinander auf
+        self._lock = asyncio.Lock()
+
+    async def async_update(self, now: float = None) -> bool:
+        """
+        Reihen aller Strings aktualisieren. Requests nur bei neuem Modelllauf
+        bzw. abgelaufenem Cache. True, wenn sich eine Reihe geändert hat.
+        Ist ein neuer Lauf nicht abrufbar, bleibt der letzte gute Lauf stehen;
+        ClientError / TimeoutError nur, wenn es noch keine Antwort gibt.
+        Aufrufe laufen nacheinander, ein wartender Aufruf trifft den frischen Cache.
+        """
+        async with self._lock:
+            return await self._async_update(now)
+
+    async def _async_update(self, now: float) -> bool:
+        previous_run = self.model_run
+        meta_model = META_MODELS.get(self.model)
+        if meta_model is not None:
+            try:
+                self.model_run = await self.client.async_model_run(meta_model, now)
+            except (aiohttp.ClientError, TimeoutError) as err:
+                # Ohne meta.json wie bei Modellen ohne Laufinfo weiter
+                _LOGGER.debug("meta.json für %s nicht abrufbar: %s", meta_model, err)
+                self.model_run = None
+        run = self.model_run.initialisation if self.model_run is not None else None
+
+        changed = False
+        for index, batch in enumerate(self._batches):
+            try:
+                body = await self.client.async_fetch(batch.params, run, now)
+            except (aiohttp.ClientError, TimeoutError) as err:
+                if self._bodies[index] is None:
+                    raise
+                # Z.B. 429 / 5xx direkt nach einem neuen Lauf: alten Lauf behalten,
+                # nächste Prüfung nach RUN_RETRY (next_check)
+                _LOGGER.warning("Open-Meteo: neuer Stand nicht abrufbar (%s), verwende letzten Lauf", err)
+                self.model_run = previous_run
+                continue
+            self._keys[index] = cache_key(batch.params, run)
+            if body is not self._bodies[index]:
+                changed = True
+                self._bodies[index] = body
+                for plane, series in split_batch(body, batch, self.planes).items():
+                    self.series[plane] = series
+        if changed:
+            self.curve = hourly_curve(self.series)
+        keys = [key for key in self._keys if key is not None]
+        if meta_model is not None:
+            keys.append(meta_key(meta_model))
+        self.cache.retain(keys)
+        return changed
+
+    def next_check(self, now: float) -> float:
+        """Zeitpunkt der nächsten Prüfung: kurz nach dem nächsten erwarteten Lauf."""
+        if self.model_run is None:
+            return now + CACHE_MAX_AGE
+        return max(self.model_run.next_expected(), now + RUN_RETRY)
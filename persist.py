@@ -0,0 +1,52 @@
+"""
+Persistenz des letzten Rechenstands.
+
+Gespeichert werden die Eingänge und alle Ausgangswerte (ohne
+NumPy-Zwischenwerte) über helpers.storage.Store. Beim Setup wird der
+Stand sofort wiederhergestellt, damit die Sensoren nicht bei 0 / None
+starten; neu gerechnet wird erst, wenn die Upstream-Sensoren da sind.
+Welche Werte danach neu gerechnet werden, ergibt der Vergleich der
+gespeicherten mit den aktuellen Eingängen (changed_inputs).
+"""
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+# Sekunden, die Schreibvorgänge zusammengefasst werden
+SAVE_DELAY = 30
+
+
+class ModelStore:
+    """Versionierter Speicher für Eingänge + Ausgänge eines Config Entries."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._pending = None
+
+    async def async_load(self):
+        """Gespeicherter Stand {computed_at, inputs, values} oder None."""
+        stored = await self._store.async_load()
+        if not stored or not {"computed_at", "inputs", "values"} <= stored.keys():
+            return None
+        return stored
+
+    def async_schedule_save(self, inputs: dict, values: dict) -> None:
+        """Stand merken, geschrieben wird verzögert (SAVE_DELAY)."""
+        self._pending = (inputs, values)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Erst beim tatsächlichen Schreiben aufbereitet (ohne Vektoren)."""
+        inputs, values = self._pending
+        return {
+            "computed_at": inputs["now"],
+            "inputs": inputs,
+            "values": {key: val for key, val in values.items() if not isinstance(val, np.ndarray)},
+        }
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
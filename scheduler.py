@@ -0,0 +1,65 @@
+"""
+Zusammenfassen von Upstream-Änderungen zu einem Rechendurchlauf.
+
+Open-Meteo aktualisiert alle Strings innerhalb weniger hundert Millisekunden.
+Der Scheduler wartet, bis für 'quiet_window' Sekunden keine Änderung mehr
+kam, spätestens aber 'max_delay' Sekunden nach der ersten Änderung, und
+startet dann genau einen Durchlauf. Läuft noch ein Durchlauf (z.B. Abruf
+der direkten Datenquelle), wird der nächste danach nachgeholt.
+"""
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+
+class CoalescingScheduler:
+    """Debounce mit Ruhefenster und maximaler Verzögerung."""
+
+    def __init__(self, hass: HomeAssistant, quiet_window: float, max_delay: float, action):
+        self._hass = hass
+        self._quiet_window = quiet_window
+        self._max_delay = max(max_delay, quiet_window)
+        self._action = action
+        self._first = None
+        self._unsub = None
+        # Durchlauf läuft / während des Durchlaufs neue Änderung gemeldet
+        self._running = False
+        self._queued = False
+
+    @callback
+    def async_schedule(self) -> None:
+        """Änderung melden; verschiebt den Durchlauf bis zur Ruhe (max. max_delay)."""
+        now = self._hass.loop.time()
+        if self._first is None:
+            self._first = now
+        if self._unsub is not None:
+            self._unsub()
+        delay = min(self._quiet_window, max(0.0, self._first + self._max_delay - now))
+        self._unsub = async_call_later(self._hass, delay, self._fire)
+
+    @callback
+    def _fire(self, _now) -> None:
+        self._first = None
+        self._unsub = None
+        if self._running:
+            # Nach dem laufenden Durchlauf noch einmal
+            self._queued = True
+            return
+        self._hass.async_create_task(self._async_run())
+
+    async def _async_run(self) -> None:
+        self._running = True
+        try:
+            await self._action()
+        finally:
+            self._running = False
+        if self._queued:
+            self._queued = False
+            self.async_schedule()
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+        self._first = None
+        self._unsub = None
+        self._queued = False
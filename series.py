@@ -0,0 +1,141 @@
+"""
+Stundenreihen aus den Attributen der Open-Meteo-Tages-Sensoren.
+
+Die Open-Meteo Solar Forecast Integration hängt an jeden Tages-Sensor
+(energy_production_today/tomorrow/d2/d3) die Reihen "wh_period" (Wh je
+Stunde) und "watts" (Leistung in W) als Attribute. Pro String werden die
+vier Tage zu einer Array-Reihe zusammengesetzt; daraus ergeben sich alle
+Kennzahlen, für die sonst eigene Upstream-Sensoren nötig wären
+(current_hour, next_hour, today_remaining, Peak-Zeiten).
+"""
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+ATTR_WH_PERIOD = "wh_period"
+ATTR_WATTS = "watts"
+# Tage der Reihe (Offset ab heute) => Eingang
+DAYS = ("today", "tomorrow", "d2", "d3")
+
+
+class HourlySeries(NamedTuple):
+    """Zeitreihe: Startzeitpunkte (Unix-Time, aufsteigend) und Werte."""
+    starts: np.ndarray
+    values: np.ndarray
+
+
+EMPTY = HourlySeries(np.empty(0), np.empty(0))
+
+
+def _timestamp(key):
+    """Attribut-Schlüssel (datetime oder ISO-8601-String) => Unix-Time, sonst None."""
+    if isinstance(key, datetime):
+        return key.timestamp()
+    try:
+        return datetime.fromisoformat(str(key)).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_series(attributes, key: str) -> HourlySeries:
+    """Ein Attribut {Zeitpunkt: Wert} => HourlySeries (sortiert, ungültige Einträge verworfen)."""
+    raw = attributes.get(key) if attributes else None
+    if not raw:
+        return EMPTY
+    points = []
+    for when, value in raw.items():
+        ts = _timestamp(when)
+        if ts is None:
+            continue
+        try:
+            points.append((ts, float(value)))
+        except (TypeError, ValueError):
+            continue
+    if not points:
+        return EMPTY
+    points.sort()
+    data = np.array(points, dtype=float)
+    return HourlySeries(data[:, 0], data[:, 1])
+
+
+def parse_day(attributes) -> tuple:
+    """Attribute eines Tages-Sensors => (Energie-Reihe in Wh, Leistungs-Reihe in W)."""
+    return parse_series(attributes, ATTR_WH_PERIOD), parse_series(attributes, ATTR_WATTS)
+
+
+class StringSeries:
+    """Energie- und Leistungsreihe eines Strings über heute..d3."""
+
+    def __init__(self, days):
+        """days => [(Energie, Leistung)] je Tag, wie von parse_day()."""
+        self.energy = _concat([energy for energy, _power in days])
+        self.power = _concat([power for _energy, power in days])
+        # Kumulierte Energie (Wh) => Summe über jeden Zeitraum in O(log n)
+        self._cumulative = np.concatenate(([0.0], np.cumsum(self.energy.values)))
+
+    def energy_between(self, start: float, end: float) -> float:
+        """kWh der Stunden mit Beginn in [start, end)."""
+        lo, hi = np.searchsorted(self.energy.starts, (start, end))
+        return float(self._cumulative[hi] - self._cumulative[lo]) / 1000.0
+
+    def remaining(self, now: float, start: float, end: float) -> float:
+        """kWh von 'now' bis 'end', die laufende Stunde (Beginn 'start') anteilig."""
+        current = self.energy_between(start, start + 3600)
+        return current * (start + 3600 - now) / 3600 + self.energy_between(start + 3600, end)
+
+    def covers(self, start: float, end: float) -> bool:
+        """True, wenn die Reihe den ganzen Zeitraum [start, end) abdeckt (erste und letzte Stunde)."""
+        starts = self.energy.starts
+        return bool(len(starts)) and starts[0] <= start and starts[-1] >= end - 3600
+
+    def peak_time(self, start: float, end: float):
+        """Zeitpunkt der höchsten Leistung in [start, end), sonst None."""
+        lo, hi = np.searchsorted(self.power.starts, (start, end))
+        if lo >= hi:
+            return None
+        return float(self.power.starts[lo + int(np.argmax(self.power.values[lo:hi]))])
+
+
+def _concat(parts) -> HourlySeries:
+    parts = [part for part in parts if len(part.starts)]
+    if not parts:
+        return EMPTY
+    return HourlySeries(np.concatenate([part.starts for part in parts]),
+                        np.concatenate([part.values for part in parts]))
+
+
+def derive_inputs(strings, calendar, now: float, step: float) -> dict:
+    """
+    Kennzahlen je String aus den Reihen, im Format von _read_inputs().
+    Der Rest heute rechnet die laufende Stunde ab dem Beginn des aktuellen
+    'step'-Schritts anteilig (gleicher Wert bis zum nächsten Uhrzeit-Tick).
+    """
+    hour = calendar.hour_start(now)
+    tick = hour + (now - hour) // step * step
+    day_starts = calendar.day_starts
+    inputs = {
+        "current_hour": [series.energy_between(hour, hour + 3600) for series in strings],
+        "next_hour": [series.energy_between(hour + 3600, hour + 7200) for series in strings],
+        "today_remaining": [series.remaining(tick, hour, day_starts[1]) for series in strings],
+        "peak_today": [series.peak_time(day_starts[0], day_starts[1]) for series in strings],
+        "peak_tomorrow": [series.peak_time(day_starts[1], day_starts[2]) for series in strings],
+    }
+    for offset, metric in enumerate(DAYS):
+        inputs[metric] = [
+            series.energy_between(day_starts[offset], day_starts[offset + 1]) for series in strings
+        ]
+    inputs["remaining_dif"] = list(zip(inputs["today_remaining"], inputs["next_hour"]))
+    return inputs
+
+
+def uncovered_inputs(strings, calendar) -> frozenset:
+    """Tageseingänge (inkl. Peak-Zeiten), deren Tag nicht jede Reihe vollständig abdeckt."""
+    day_starts = calendar.day_starts
+    uncovered = set()
+    for offset, metric in enumerate(DAYS):
+        if not all(series.covers(day_starts[offset], day_starts[offset + 1]) for series in strings):
+            uncovered.add(metric)
+            if offset < 2:
+                uncovered.add(f"peak_{metric}")
+    return frozenset(uncovered)
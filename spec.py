@@ -0,0 +1,146 @@
+"""
+Deklarative Spezifikation aller sfdb_-Sensoren.
+
+Eine Zeile je Sensor (Registrierungsreihenfolge): Name, Formel-Art,
+Eingänge und Parameter. Zwischenwerte (internal=True) werden nur im Modell
+gehalten und nur mit der Debug-Option als Entity angelegt. Das Rechenmodell baut aus den Zeilen die Knoten,
+sensor.py die Entities. Neue Sensor-Familien sind neue Zeilen; nur
+Sonderfälle (Formel-Art "node") sind als eigene Funktion im Modell
+hinterlegt.
+
+Formel-Arten:
+    node          eigene Funktion in model.py (gleicher Schlüssel)
+    round         round(inputs[a], p0)
+    hour          round(int(inputs[a] / 3600), 1)
+    sum_positive  Summe der Strings inputs[a], negativ => 0
+    linear        round(s0 * v[a] + s1 * v[b] + ..., p[-1]) (von links nach rechts)
+    half_wrap     z = v[a]; z < p0 => +24, z > p1 => -24; round(z / 2, 1)
+    index         round(v[a][p0], p1)
+    copy          v[a]
+"""
+from typing import NamedTuple
+
+# Forecast-Stunden je Tag
+FORECAST_HOURS_TODAY = [2, 3, 4, 6, 9, 12]
+FORECAST_HOURS_TOMORROW = [15, 18, 21, 24, 27, 30, 33, 36]
+FORECAST_HOURS_D2 = [39, 42, 45, 48, 51, 54, 57, 60]
+FORECAST_HOURS_D3 = [63, 66, 69, 72, 75, 78]
+
+# Zuordnung Forecast-Tag => Production-SUM
+FORECAST_DAYS = [
+    ("today", FORECAST_HOURS_TODAY, "sfdb_energy_production_today_sum"),
+    ("tomorrow", FORECAST_HOURS_TOMORROW, "sfdb_energy_production_tomorrow_sum"),
+    ("d2", FORECAST_HOURS_D2, "sfdb_energy_production_d2_sum"),
+    ("d3", FORECAST_HOURS_D3, "sfdb_energy_production_d3_sum"),
+]
+
+# Alle Forecast-Horizonte (2..78 h) in Reihenfolge
+HORIZON_HOURS = [hour for _day, hours, _prod in FORECAST_DAYS for hour in hours]
+
+# Time-Diff-Stunden (01h..78h)
+TIMEDIF_HOURS = [1, 2, 3, 4] + list(range(6, 79, 3))
+
+
+def timedif_name(hour: int) -> str:
+    """Name des Time-Diff-Sensors für eine Stunde."""
+    return f"sfdb_energy_timedif_{hour:02d}h"
+
+
+def forecast_name(hour: int, is_z: bool) -> str:
+    """Name des Forecast-Sensors (_SUM_z bzw. _SUM)."""
+    if is_z:
+        return f"sfdb_energy_{hour:02d}h_SUM_z"
+    return f"sfdb_energy_{hour:02d}h_SUM"
+
+
+class SensorSpec(NamedTuple):
+    """Eine Zeile der Sensor-Tabelle."""
+
+    name: str
+    kind: str
+    inputs: tuple = ()
+    params: tuple = ()
+    # Einzelner Stunden-Sensor (Option "Stunden-Sensoren")
+    hourly: bool = False
+    # Zwischenwert, nur mit Option "Zwischenwerte anzeigen" als Entity
+    internal: bool = False
+
+
+_PEAK_TODAY = "sfdb_power_highest_peak_time_today_SUM"
+_RISING_SUM = "sfdb_power_sun_rising_time_today_SUM"
+_SETTING_SUM = "sfdb_power_sun_setting_time_today_SUM"
+_RISING_DIF = "sfdb_power_sun_rising_time_today_SUM_dif"
+_SETTING_DIF = "sfdb_power_sun_setting_time_today_SUM_dif"
+_TIMEDIF_TODAY = "sfdb_energy_timedif_today"
+
+SENSOR_SPECS = (
+    #
+    # (1) PEAK-TIME, SUN, ENERGY_REDUZIERT
+    #
+    SensorSpec("sfdb_peak_time_average", "node"),
+    SensorSpec("sfdb_sun_rising", "round", ("sun_rising",), (2,)),
+    SensorSpec("sfdb_sun_setting", "round", ("sun_setting",), (2,)),
+    SensorSpec("sfdb_energy_reduziert", "round", ("energy_reduziert",), (2,)),
+
+    #
+    # (2) High Peak Time (Today, Tomorrow), TimeDiff Today, SunRising/Setting
+    #
+    SensorSpec("sfdb_power_highest_peak_time_today_SUM_day", "node"),
+    SensorSpec("sfdb_power_highest_peak_time_today_SUM_dif", "node"),
+    SensorSpec(_PEAK_TODAY, "node"),
+    SensorSpec(_TIMEDIF_TODAY, "node"),
+    SensorSpec("sfdb_power_highest_peak_time_tomorrow_SUM_dif", "node"),
+    SensorSpec("sfdb_power_highest_peak_time_tomorrow_SUM", "node"),
+    SensorSpec("sfdb_energy_timedif_tomorrow", "node"),
+    SensorSpec(_RISING_SUM, "hour", ("sun_next_rising",)),
+    SensorSpec(f"{_RISING_DIF}_z", "linear", (_PEAK_TODAY, _RISING_SUM), (1, -1, 1), internal=True),
+    SensorSpec(_RISING_DIF, "half_wrap", (f"{_RISING_DIF}_z",), (0, float("inf"))),
+    SensorSpec(_SETTING_SUM, "hour", ("sun_next_setting",)),
+    SensorSpec(f"{_SETTING_DIF}_z", "linear", (_SETTING_SUM, _PEAK_TODAY), (1, -1, 1), internal=True),
+    SensorSpec(_SETTING_DIF, "half_wrap", (f"{_SETTING_DIF}_z",), (float("-inf"), 24)),
+
+    #
+    # (3) Time-Diff (01h..78h) + Extra 1..4
+    #
+    *(SensorSpec(timedif_name(hour), "index", ("_timedif_vector",), (index, 2), hourly=True, internal=True)
+      for index, hour in enumerate(TIMEDIF_HOURS)),
+    SensorSpec("sfdb_energy_timedif_1", "linear", (_TIMEDIF_TODAY, _RISING_DIF, _RISING_DIF), (1, 1, 1, 1),
+               internal=True),
+    SensorSpec("sfdb_energy_timedif_2", "linear", (_TIMEDIF_TODAY, _RISING_DIF), (1, 1, 1), internal=True),
+    SensorSpec("sfdb_energy_timedif_3", "linear", (_TIMEDIF_TODAY, _SETTING_DIF), (1, -1, 1), internal=True),
+    SensorSpec("sfdb_energy_timedif_4", "linear", (_TIMEDIF_TODAY, _SETTING_DIF, _SETTING_DIF), (1, -1, -1, 1),
+               internal=True),
+
+    #
+    # (4) energy_reduziert_01_sum .. 04_sum
+    #
+    *(SensorSpec(f"sfdb_energy_reduziert_{i:02d}_sum", "node", internal=True) for i in range(1, 5)),
+
+    #
+    # (5) Production, (6) Production SUM
+    #
+    SensorSpec("sfdb_energy_production_today_remaining_SUM_dif", "node"),
+    SensorSpec("sfdb_energy_next_hour_SUM", "sum_positive", ("next_hour",)),
+    SensorSpec("sfdb_energy_current_hour_SUM", "sum_positive", ("current_hour",)),
+    SensorSpec("sfdb_energy_production_today_remaining_SUM", "sum_positive", ("today_remaining",)),
+    SensorSpec("sfdb_energy_production_today_SUM", "sum_positive", ("today",)),
+    SensorSpec("sfdb_energy_production_tomorrow_SUM", "sum_positive", ("tomorrow",)),
+    SensorSpec("sfdb_energy_production_d2_SUM", "sum_positive", ("d2",)),
+    SensorSpec("sfdb_energy_production_d3_SUM", "sum_positive", ("d3",)),
+
+    #
+    # (7) Forecast today / tomorrow / d2 / d3 => Z- und SUM-Variante (identisch, aus dem Tages-Segment)
+    #
+    *(spec
+      for day, hours, _prod in FORECAST_DAYS
+      for index, hour in enumerate(hours)
+      for spec in (
+          SensorSpec(forecast_name(hour, True), "index", (f"_forecast_{day}",), (index, 1), hourly=True),
+          SensorSpec(forecast_name(hour, False), "copy", (forecast_name(hour, True),), hourly=True),
+      )),
+
+    #
+    # (8) ProdRemain
+    #
+    SensorSpec("sfdb_prod_remain", "round", ("prod_remain",), (2,)),
+)
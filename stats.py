@@ -0,0 +1,83 @@
+"""
+Laufzeit-Statistik je Sensor-Familie.
+
+Pro Rechenzyklus werden Wall-Time, State-Lookups und State-Writes je Familie
+gesammelt. Die letzten WINDOW Zyklen bleiben in Ringpuffern, daraus werden
+p50/p95 für die Diagnose-Sensoren berechnet. Im Zyklus selbst fallen nur
+Additionen an, sortiert wird erst beim Auslesen.
+"""
+import time
+from collections import deque
+
+FAMILIES = ("peak", "sun", "timedif", "reduziert", "production", "forecast")
+METRICS = ("time", "lookups", "writes")
+
+# Anzahl der Zyklen für p50/p95
+WINDOW = 200
+
+
+def _percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class _Measure:
+    """Misst Zeit und Lookups eines Blocks für eine Familie."""
+
+    __slots__ = ("_stats", "_family", "_cache", "_start", "_lookups")
+
+    def __init__(self, stats, family: str, cache):
+        self._stats = stats
+        self._family = family
+        self._cache = cache
+
+    def __enter__(self):
+        self._lookups = self._cache.lookups
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self._stats._current[self._family]
+        current[0] += time.perf_counter() - self._start
+        current[1] += self._cache.lookups - self._lookups
+        return False
+
+
+class UpdateStats:
+    """Sammelt Zeit / Lookups / Writes je Familie über die letzten Zyklen."""
+
+    def __init__(self, window: int = WINDOW):
+        self._history = {
+            family: {metric: deque(maxlen=window) for metric in METRICS}
+            for family in FAMILIES
+        }
+        self._current = None
+
+    def begin_cycle(self) -> None:
+        """Neuer Zyklus; der vorige (inkl. seiner Writes) wird übernommen."""
+        if self._current is not None:
+            for family, (seconds, lookups, writes) in self._current.items():
+                history = self._history[family]
+                history["time"].append(seconds * 1000)
+                history["lookups"].append(lookups)
+                history["writes"].append(writes)
+        self._current = {family: [0.0, 0, 0] for family in FAMILIES}
+
+    def measure(self, family: str, cache) -> _Measure:
+        """Context-Manager: Zeit und Lookups (aus cache.lookups) eines Blocks."""
+        return _Measure(self, family, cache)
+
+    def add_time(self, family: str, seconds: float) -> None:
+        if self._current is not None:
+            self._current[family][0] += seconds
+
+    def add_write(self, family: str) -> None:
+        if self._current is not None:
+            self._current[family][2] += 1
+
+    def percentiles(self, family: str, metric: str) -> tuple:
+        """(p50, p95) über das Fenster, None solange keine Daten da sind."""
+        values = self._history[family][metric]
+        return _percentile(values, 0.5), _percentile(values, 0.95)
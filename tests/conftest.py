@@ -0,0 +1,14 @@
+"""
+Gemeinsame Test-Einrichtung: das Repo-Verzeichnis wird als Package
+'graph_for_omsf' geladen (wie in den Benchmarks). Benötigt eine Umgebung
+mit installiertem Home Assistant und numpy.
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_update import load_integration  # noqa: E402
+
+load_integration()
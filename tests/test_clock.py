@@ -0,0 +1,125 @@
+"""
+Stunden-Kalender und uhrzeitabhängige Werte an Tagen mit Zeitumstellung
+(Europe/Berlin: 29.03.2026 hat 23 Stunden, 25.10.2026 hat 25 Stunden).
+"""
+import asyncio
+from datetime import date, datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf import coordinator, model
+from graph_for_omsf.clock import CalendarIndex
+
+from baseline_cases import PEAK_SENSOR, case_now, case_states
+
+BERLIN = ZoneInfo("Europe/Berlin")
+NORMAL, SPRING, FALL = date(2026, 3, 27), date(2026, 3, 29), date(2026, 10, 25)
+
+
+def _clock(tmp_path, monkeypatch, now: float) -> dict:
+    """Uhrzeit-Eingänge des Coordinators für 'now' in Europe/Berlin."""
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        hass.config.set_time_zone("Europe/Berlin")
+        entry = SimpleNamespace(entry_id="clock", data={}, options={})
+        clock = coordinator.SfdbCoordinator(hass, entry)._read_clock()
+        await hass.async_stop(force=True)
+        return clock
+
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: now)
+    return asyncio.run(scenario())
+
+
+def _node(key: str, inputs: dict, values: dict = None):
+    return model.NODES[key][1](inputs, values or {})
+
+
+def test_day_hours():
+    assert CalendarIndex(BERLIN, NORMAL).day_hours == (24, 24, 23, 24, 24)
+    assert CalendarIndex(BERLIN, SPRING).day_hours[0] == 23
+    assert CalendarIndex(BERLIN, FALL).day_hours[0] == 25
+
+
+@pytest.mark.parametrize("day", [NORMAL, SPRING, FALL], ids=str)
+def test_sum_day_counts_hours_until_midnight(day, tmp_path, monkeypatch):
+    now = datetime(day.year, day.month, day.day, 23, 30, tzinfo=BERLIN).timestamp()
+    assert _node("sfdb_power_highest_peak_time_today_sum_day", _clock(tmp_path, monkeypatch, now)) == 0.5
+
+
+def test_sum_day_after_fall_back(tmp_path, monkeypatch):
+    # 02:30 nach der Umstellung (zweites 02:30) => noch 21.5 Stunden bis Mitternacht
+    now = datetime(2026, 10, 25, 2, 30, fold=1, tzinfo=BERLIN).timestamp()
+    assert _node("sfdb_power_highest_peak_time_today_sum_day", _clock(tmp_path, monkeypatch, now)) == 21.5
+
+
+def test_timedif_wraps_use_day_lengths(tmp_path, monkeypatch):
+    # 28.03. 20:00 => morgen hat 23 Stunden, d2 und d3 24
+    inputs = _clock(tmp_path, monkeypatch, datetime(2026, 3, 28, 20, tzinfo=BERLIN).timestamp())
+    sum_day = _node("sfdb_power_highest_peak_time_today_sum_day", inputs)
+    assert sum_day == 4
+    vector = _node("_timedif_vector", inputs, {"sfdb_power_highest_peak_time_today_sum_day": sum_day})
+    timedif = dict(zip(model.TIMEDIF_HOURS, vector.tolist()))
+    assert timedif[3] == 1
+    assert timedif[6] == 4 - 6 + 23
+    assert timedif[27] == 4 - 27 + 23 + 24
+    assert timedif[78] == 4 - 78 + 23 + 24 + 24 + 24
+
+
+def test_timedif_today_and_tomorrow_use_day_lengths(tmp_path, monkeypatch):
+    inputs = _clock(tmp_path, monkeypatch, datetime(2026, 10, 25, 9, tzinfo=BERLIN).timestamp())
+    # Peak um 13:00 (13 Stunden nach Mitternacht, wegen der Umstellung): 25 - (13 - 2)
+    peak = (inputs["midnight"] + 13 * 3600) / 3600
+    values = {"sfdb_power_highest_peak_time_today_sum": peak,
+              "sfdb_power_highest_peak_time_tomorrow_sum": peak + 24}
+    assert _node("sfdb_energy_timedif_today", inputs, values) == 25 - 11
+    assert _node("sfdb_energy_timedif_tomorrow", inputs, values) == 25 + 24 - 35
+
+
+# ------------------------------------------------------------------------------
+# Uhrzeit-Tick
+# ------------------------------------------------------------------------------
+def test_next_clock_change(tmp_path, monkeypatch):
+    now = datetime(2026, 3, 27, 23, 27, tzinfo=BERLIN).timestamp()
+    inputs = _clock(tmp_path, monkeypatch, now)
+    # Nächster 0.1-h-Schritt bis Mitternacht
+    assert model.next_clock_change({**inputs, "peak_today": [None]}) == now + 180
+    # Peak in 2 h 1 min => Abstand unterschreitet 2 h nach 1 min
+    assert model.next_clock_change({**inputs, "peak_today": [now + 2 * 3600 + 60]}) == now + 60
+    # Peak vor 59 min => Abstand erreicht -1 h nach 1 min
+    assert model.next_clock_change({**inputs, "peak_tomorrow": [now - 3540]}) == now + 60
+
+
+def test_clock_tick_recomputes_peak_dif(tmp_path, monkeypatch):
+    now = case_now(3, "Europe/Berlin")
+    states = case_states(3, now, "Europe/Berlin")
+    clock = {"now": now}
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: clock["now"])
+
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        hass.config.set_time_zone("Europe/Berlin")
+        for entity_id, state in states.items():
+            hass.states.async_set(entity_id, state)
+        entry = SimpleNamespace(entry_id="tick", data={"peaktime_sensors": [PEAK_SENSOR]}, options={})
+        coord = coordinator.SfdbCoordinator(hass, entry)
+        await coord.async_refresh()
+        before = dict(coord.data)
+        ticks = []
+        # Mehrere Ticks: jeder liefert dieselben Werte wie ein kompletter Durchlauf
+        for _tick in range(12):
+            clock["now"] = model.next_clock_change(coord._inputs) + 0.5
+            coord._handle_clock_tick(None)
+            coord.stats.begin_cycle()
+            fresh = model.compute_model(coord._read_inputs())
+            ticks.append({key: (coord.data[key], fresh[key]) for key in fresh if not key.startswith("_")})
+        await hass.async_stop(force=True)
+        return before, ticks
+
+    before, ticks = asyncio.run(scenario())
+    for values in ticks:
+        assert {key: val[0] for key, val in values.items()} == {key: val[1] for key, val in values.items()}
+    assert any(values["sfdb_power_highest_peak_time_today_sum_dif"][0]
+               != before["sfdb_power_highest_peak_time_today_sum_dif"] for values in ticks)
@@ -0,0 +1,93 @@
+"""
+Cache für geparste States (coordinator.StateParseCache): Treffer je
+last_updated + Context, Neuparsen bei Änderung, Verwerfen entfernter Entities.
+"""
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf.coordinator import StateParseCache
+
+ENTITY = "sensor.energy_production_today"
+
+
+def _run(tmp_path, steps):
+    """steps(hass, cache, lookup, parsed) in einer Home-Assistant-Instanz; parsed sammelt die Parser-Aufrufe."""
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        cache = StateParseCache(hass)
+        parsed = []
+
+        def lookup(entity_id=ENTITY):
+            return cache._lookup(entity_id, "count", lambda val: parsed.append(val) or val)
+
+        try:
+            steps(hass, cache, lookup, parsed)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(scenario())
+
+
+def test_hit_while_state_is_unchanged(tmp_path):
+    def steps(hass, cache, lookup, parsed):
+        hass.states.async_set(ENTITY, "1.5")
+        assert lookup() == lookup() == "1.5"
+        # Gleicher Wert, gleiche Attribute => HA behält last_updated, kein Neuparsen
+        hass.states.async_set(ENTITY, "1.5")
+        assert lookup() == "1.5"
+        assert parsed == ["1.5"]
+        assert cache.lookups == 3
+        # Jede Art wird getrennt geparst, der Eintrag gilt für alle
+        assert cache.float_state(ENTITY) == 1.5
+        assert cache.float_state(ENTITY) == 1.5
+        assert len(cache._cache[ENTITY][2]) == 2
+
+    _run(tmp_path, steps)
+
+
+def test_changed_state_is_parsed_again(tmp_path):
+    def steps(hass, cache, lookup, parsed):
+        hass.states.async_set(ENTITY, "1.5")
+        assert cache.float_state(ENTITY) == 1.5
+        hass.states.async_set(ENTITY, "2.5")
+        assert cache.float_state(ENTITY) == 2.5
+        # force_update: neuer last_updated bei gleichem Wert
+        lookup()
+        hass.states.async_set(ENTITY, "2.5", force_update=True)
+        lookup()
+        assert parsed == ["2.5", "2.5"]
+
+    _run(tmp_path, steps)
+
+
+def test_other_context_is_parsed_again(tmp_path):
+    def steps(hass, cache, lookup, parsed):
+        hass.states.async_set(ENTITY, "1.5")
+        lookup()
+        last_updated, _context_id, values = cache._cache[ENTITY]
+        # Gleicher last_updated, anderer Context => anderer State, Eintrag ungültig
+        cache._cache[ENTITY] = (last_updated, "other", values)
+        lookup()
+        assert parsed == ["1.5", "1.5"]
+        assert cache._cache[ENTITY][1] == hass.states.get(ENTITY).context.id
+
+    _run(tmp_path, steps)
+
+
+def test_removed_entity_is_evicted_on_read(tmp_path):
+    def steps(hass, cache, lookup, parsed):
+        hass.states.async_set(ENTITY, "1.5")
+        hass.states.async_set("sensor.other", "2")
+        cache.float_state(ENTITY)
+        cache.float_state("sensor.other")
+        hass.states.async_remove(ENTITY)
+        # Erst das nächste Lesen verwirft den Eintrag
+        assert ENTITY in cache._cache
+        assert cache.float_state(ENTITY, 7.0) == 7.0
+        assert cache.timestamp_state(ENTITY) is None
+        assert set(cache._cache) == {"sensor.other"}
+        cache.clear()
+        assert not cache._cache
+
+    _run(tmp_path, steps)
@@ -0,0 +1,164 @@
+"""
+Schreib-Gate (gate.py), Nachschreiben zurückgehaltener Werte im Sensor und
+der Options-Schritt für das Gate.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import voluptuous as vol
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf import sensor
+from graph_for_omsf.config_flow import SolarForecastOptionsFlowHandler, write_gate_field
+from graph_for_omsf.const import CONF_WRITE_GATE, DEFAULT_WRITE_GATE
+from graph_for_omsf.coordinator import SfdbCoordinator
+from graph_for_omsf.gate import WriteGate
+
+
+def _written(gate: WriteGate, value, now: float) -> WriteGate:
+    gate.mark_written(value, now)
+    return gate
+
+
+def test_first_value_is_always_written():
+    assert WriteGate().should_write(1.0, 0.0)
+
+
+def test_exact_equality_without_epsilon():
+    gate = _written(WriteGate(), 1.0, 0.0)
+    assert not gate.should_write(1.0, 10.0)
+    assert gate.should_write(1.01, 10.0)
+    # Nicht-numerische Werte (z.B. Kurven-Tupel) per Vergleich
+    gate = _written(WriteGate(abs_epsilon=1.0), (1.0, 2.0), 0.0)
+    assert not gate.should_write((1.0, 2.0), 10.0)
+    assert gate.should_write((1.0, 2.1), 10.0)
+
+
+def test_abs_and_rel_epsilon():
+    gate = _written(WriteGate(abs_epsilon=0.1), 5.0, 0.0)
+    assert not gate.should_write(5.1, 10.0)
+    assert gate.should_write(5.11, 10.0)
+    gate = _written(WriteGate(rel_epsilon=0.05), 100.0, 0.0)
+    assert not gate.should_write(104.0, 10.0)
+    assert gate.should_write(94.0, 10.0)
+    # Die größere der beiden Toleranzen gilt
+    gate = _written(WriteGate(abs_epsilon=1.0, rel_epsilon=0.01), 10.0, 0.0)
+    assert not gate.should_write(10.9, 10.0)
+
+
+def test_min_interval_defers_changed_values():
+    gate = _written(WriteGate(min_interval=60), 1.0, 0.0)
+    assert not gate.should_write(2.0, 15.0)
+    assert gate.deferred == 45.0
+    # Unverändert innerhalb min_interval => nichts nachzuschreiben
+    assert not gate.should_write(1.0, 20.0)
+    assert gate.deferred == 0.0
+    assert gate.should_write(2.0, 60.0)
+    assert gate.deferred == 0.0
+
+
+def test_max_interval_rewrites_unchanged_values():
+    gate = _written(WriteGate(max_interval=3600), 1.0, 0.0)
+    assert not gate.should_write(1.0, 3599.0)
+    assert gate.should_write(1.0, 3600.0)
+    assert not _written(WriteGate(), 1.0, 0.0).should_write(1.0, 1e9)
+
+
+# ------------------------------------------------------------------------------
+# Nachschreiben im Sensor
+# ------------------------------------------------------------------------------
+def test_sensor_flushes_deferred_value(tmp_path, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(sensor.time, "monotonic", lambda: clock["now"])
+    gate = {"peak": {"min_interval": 60}}
+
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        entry = SimpleNamespace(entry_id="gate", data={}, options={CONF_WRITE_GATE: gate})
+        coord = SfdbCoordinator(hass, entry)
+        coord.data = {"sfdb_peak_time_average": 1.0}
+        entity = sensor.SfdbSensor(coord, entry, "sfdb_peak_time_average")
+        entity.hass = hass
+        writes = []
+        entity.async_write_ha_state = lambda: writes.append(entity.state)
+        entity._gate.mark_written(1.0, clock["now"])
+
+        clock["now"] += 10
+        coord.data = {"sfdb_peak_time_average": 2.0}
+        entity._handle_coordinator_update()
+        assert writes == [] and entity._unsub_flush is not None
+        # Nach Ablauf von min_interval wird der zurückgehaltene Wert geschrieben
+        clock["now"] += 50
+        entity._handle_flush(None)
+        assert writes == [2.0] and entity._unsub_flush is None
+
+        # Ein regulärer Write vor Ablauf verwirft das geplante Nachschreiben
+        clock["now"] += 10
+        coord.data = {"sfdb_peak_time_average": 3.0}
+        entity._handle_coordinator_update()
+        assert entity._unsub_flush is not None
+        clock["now"] += 60
+        coord.data = {"sfdb_peak_time_average": 4.0}
+        entity._handle_coordinator_update()
+        assert writes == [2.0, 4.0] and entity._unsub_flush is None
+        await hass.async_stop(force=True)
+
+    asyncio.run(scenario())
+
+
+# ------------------------------------------------------------------------------
+# Options-Schritt
+# ------------------------------------------------------------------------------
+def _gate_input(**overrides) -> dict:
+    user_input = {
+        write_gate_field(family, param): value
+        for family, params in DEFAULT_WRITE_GATE.items()
+        for param, value in params.items()
+    }
+    user_input.update(overrides)
+    return user_input
+
+
+def _run_write_gate_step(tmp_path, user_input):
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        entry = SimpleNamespace(entry_id="options", data={}, options={"quiet_window": 5.0})
+        flow = SolarForecastOptionsFlowHandler(entry)
+        flow.hass = hass
+        flow._options = {**entry.options, "max_delay": 20.0}
+        result = await flow.async_step_write_gate(user_input)
+        await hass.async_stop(force=True)
+        return result
+
+    return asyncio.run(scenario())
+
+
+def test_options_step_shows_current_gate(tmp_path):
+    result = _run_write_gate_step(tmp_path, None)
+    assert result["step_id"] == "write_gate"
+    defaults = {str(key): key.default() for key in result["data_schema"].schema}
+    assert defaults[write_gate_field("forecast", "max_interval")] == DEFAULT_WRITE_GATE["forecast"]["max_interval"]
+
+
+def test_options_step_stores_gate(tmp_path):
+    result = _run_write_gate_step(tmp_path, _gate_input(forecast_abs_epsilon=0.05, forecast_min_interval=30.0))
+    assert result["type"] == "create_entry"
+    # Options aus dem ersten Schritt und bisherige Options bleiben erhalten
+    assert result["data"]["quiet_window"] == 5.0 and result["data"]["max_delay"] == 20.0
+    forecast = result["data"][CONF_WRITE_GATE]["forecast"]
+    assert (forecast["abs_epsilon"], forecast["min_interval"]) == (0.05, 30.0)
+
+
+def test_options_step_rejects_max_below_min(tmp_path):
+    result = _run_write_gate_step(tmp_path, _gate_input(peak_min_interval=600.0, peak_max_interval=300.0))
+    assert result["type"] == "form"
+    assert result["errors"] == {"base": "invalid_write_gate"}
+
+
+@pytest.mark.parametrize("field, value", [("peak_abs_epsilon", -1), ("peak_rel_epsilon", 1.5),
+                                          ("peak_min_interval", -5)])
+def test_options_step_validates_ranges(tmp_path, field, value):
+    schema = _run_write_gate_step(tmp_path, None)["data_schema"]
+    with pytest.raises(vol.Invalid):
+        schema(_gate_input(**{field: value}))
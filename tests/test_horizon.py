@@ -0,0 +1,120 @@
+"""
+Tages-Ringpuffer (horizon.py): Rotation um Mitternacht, übersprungene und
+rückwärts laufende Tage, Halten bis Upstream umspringt, ROLLOVER_HOLD.
+"""
+from datetime import date, timedelta
+
+from graph_for_omsf.horizon import ROLLOVER_HOLD, DayRing
+
+DAY = date(2026, 6, 10)
+MIDNIGHT = 1781042400.0
+PEAK = 1781085600.0
+
+
+def _upstream(now: float, base: float = 1.0, peak: float = PEAK) -> dict:
+    """Tageseingänge eines Tages mit zwei Strings; 'base' macht die Tage unterscheidbar."""
+    return {
+        "now": now,
+        "today": [base, base + 0.5],
+        "tomorrow": [base + 1, base + 1.5],
+        "d2": [base + 2, base + 2.5],
+        "d3": [base + 3, base + 3.5],
+        "peak_today": [peak, None],
+        "peak_tomorrow": [peak + 86400, None],
+    }
+
+
+def _ring() -> DayRing:
+    ring = DayRing()
+    ring.apply(DAY, _upstream(MIDNIGHT - 3600))
+    return ring
+
+
+def test_one_day_shift():
+    ring = _ring()
+    # Upstream noch vom Vortag => rotierte Werte
+    inputs = ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60))
+    assert inputs["today"] == [2.0, 2.5]
+    assert inputs["tomorrow"] == [3.0, 3.5]
+    assert inputs["d2"] == [4.0, 4.5]
+    # Neuer d3-Slot ohne Daten => letzter d3-Wert
+    assert inputs["d3"] == [4.0, 4.5]
+    assert inputs["peak_today"] == [PEAK + 86400, None]
+    # Kein Peak für übermorgen bekannt => Peak von morgen um einen Tag verschoben
+    assert inputs["peak_tomorrow"] == [PEAK + 2 * 86400, None]
+
+
+def test_hold_until_upstream_flips():
+    ring = _ring()
+    ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60))
+    # Nur 'today' und 'peak_today' sind umgesprungen
+    flipped = {**_upstream(MIDNIGHT + 600), "today": [7.0, 7.5], "peak_today": [PEAK + 90000, None]}
+    inputs = ring.apply(DAY + timedelta(days=1), dict(flipped))
+    assert inputs["today"] == [7.0, 7.5]
+    assert inputs["peak_today"] == [PEAK + 90000, None]
+    assert inputs["tomorrow"] == [3.0, 3.5]
+    # Umgesprungen bleibt umgesprungen, auch wenn der Wert wieder dem Vortag entspricht
+    inputs = ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 900))
+    assert inputs["today"] == [1.0, 1.5]
+    assert inputs["tomorrow"] == [3.0, 3.5]
+
+
+def test_tick_without_upstream_keeps_rotated_values():
+    ring = _ring()
+    ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60))
+    # Uhrzeit-Tick: 'inputs' sind die Modell-Eingänge, nicht Upstream
+    ticked = {**_upstream(MIDNIGHT + 360), "today": [9.0, 9.0]}
+    inputs = ring.apply(DAY + timedelta(days=1), ticked, upstream=False)
+    assert inputs["today"] == [2.0, 2.5]
+
+
+def test_uncovered_is_held_even_if_changed():
+    ring = _ring()
+    ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60))
+    # Reihe deckt den neuen Tag noch nicht ab: geänderter Wert zählt nicht als umgesprungen
+    changed = {**_upstream(MIDNIGHT + 600), "today": [0.0, 0.0]}
+    inputs = ring.apply(DAY + timedelta(days=1), changed, uncovered=frozenset({"today"}))
+    assert inputs["today"] == [2.0, 2.5]
+    changed = {**_upstream(MIDNIGHT + 900), "today": [6.0, 6.5]}
+    inputs = ring.apply(DAY + timedelta(days=1), changed)
+    assert inputs["today"] == [6.0, 6.5]
+
+
+def test_hold_expires():
+    ring = _ring()
+    ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60))
+    inputs = ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60 + ROLLOVER_HOLD - 1))
+    assert inputs["today"] == [2.0, 2.5]
+    # Nach ROLLOVER_HOLD gilt Upstream, auch wenn er nicht umgesprungen ist
+    inputs = ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60 + ROLLOVER_HOLD))
+    assert inputs["today"] == [1.0, 1.5]
+    inputs = ring.apply(DAY + timedelta(days=1), _upstream(MIDNIGHT + 60 + ROLLOVER_HOLD + 1))
+    assert inputs["today"] == [1.0, 1.5]
+
+
+def test_skipped_day():
+    ring = _ring()
+    inputs = ring.apply(DAY + timedelta(days=2), _upstream(MIDNIGHT + 86400 + 60))
+    assert inputs["today"] == [3.0, 3.5]
+    assert inputs["tomorrow"] == [4.0, 4.5]
+    assert inputs["d2"] == inputs["d3"] == [4.0, 4.5]
+    assert inputs["peak_today"] == [PEAK + 2 * 86400, None]
+    assert inputs["peak_tomorrow"] == [PEAK + 3 * 86400, None]
+
+
+def test_no_rotation_backwards_or_too_far():
+    for shift in (-1, 4):
+        ring = _ring()
+        upstream = _upstream(MIDNIGHT + shift * 86400 + 60)
+        inputs = ring.apply(DAY + timedelta(days=shift), dict(upstream))
+        assert inputs == upstream
+        # Nichts wird gehalten
+        later = ring.apply(DAY + timedelta(days=shift), _upstream(MIDNIGHT + shift * 86400 + 600))
+        assert later["today"] == [1.0, 1.5]
+
+
+def test_no_rotation_before_first_day():
+    ring = DayRing()
+    inputs = ring.apply(DAY, _upstream(MIDNIGHT - 3600))
+    assert inputs == _upstream(MIDNIGHT - 3600)
+    assert ring.day == DAY
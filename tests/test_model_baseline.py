@@ -0,0 +1,45 @@
+"""
+Regressionstest: das Modell liefert für alle Sensoren dieselben Werte wie die
+Einzelsensoren des Baseline-Commits (30 Fälle je Zeitzone, siehe baseline_cases.py).
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf import coordinator, model
+
+from baseline_cases import FIXTURE, PEAK_SENSOR, case_now, case_states
+
+BASELINE = json.loads(FIXTURE.read_text())
+
+
+async def _model_values(config_dir: str, time_zone: str, now: float, states: dict) -> dict:
+    hass = HomeAssistant(config_dir)
+    hass.config.set_time_zone(time_zone)
+    for entity_id, state in states.items():
+        hass.states.async_set(entity_id, state)
+    entry = SimpleNamespace(entry_id="baseline", data={"peaktime_sensors": [PEAK_SENSOR], "energy_reduziert": 0.6},
+                            options={})
+    coord = coordinator.SfdbCoordinator(hass, entry)
+    coord.stats.begin_cycle()
+    values = model.compute_model(coord._read_inputs())
+    await hass.async_stop(force=True)
+    return values
+
+
+@pytest.mark.parametrize("case", BASELINE["cases"], ids=lambda case: f"{case['time_zone']}-{case['seed']}")
+def test_model_matches_baseline(case, tmp_path, monkeypatch):
+    now = case_now(case["seed"], case["time_zone"])
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: now)
+    values = asyncio.run(_model_values(str(tmp_path), case["time_zone"], now,
+                                       case_states(case["seed"], now, case["time_zone"])))
+
+    mismatches = {
+        name: (expected, values[name])
+        for name, expected in zip(BASELINE["names"], case["values"])
+        if float(values[name]) != expected
+    }
+    assert not mismatches
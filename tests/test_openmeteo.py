@@ -0,0 +1,266 @@
+"""
+Abrufpfad der direkten Datenquelle gegen den lokalen Ersatz-Server
+(benchmarks/openmeteo_standin.py): Bündelung, Aufteilung je Fläche, Cache,
+Modelllauf und Zeitpunkt der nächsten Prüfung.
+"""
+import asyncio
+import contextlib
+import time
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf import coordinator, openmeteo
+from graph_for_omsf.clock import CalendarIndex
+from graph_for_omsf.const import CONF_DIRECT_SOURCE, CONF_PLANES
+from graph_for_omsf.openmeteo import CACHE_MAX_AGE, RUN_RETRY, OpenMeteoSource, Plane
+from graph_for_omsf.series import uncovered_inputs
+
+import openmeteo_standin
+
+LATITUDE, LONGITUDE = 52.52, 13.41
+NOW = 1780000000.0
+
+PLANES = [
+    Plane(30, 0, 5.0),
+    Plane(30, 0, 10.0),
+    Plane(30, -90, 5.0),
+    Plane(30, 0, 5.0, 48.14, 11.58),
+]
+
+
+@contextlib.asynccontextmanager
+async def stand_in(config_dir: str):
+    """Ersatz-Server (Uhr fest auf NOW) und eine Home-Assistant-Instanz."""
+    standin, runner, base = await openmeteo_standin.start()
+    standin.clock = lambda: NOW
+    hass = HomeAssistant(config_dir)
+    try:
+        yield standin, hass, base
+    finally:
+        await hass.async_stop(force=True)
+        await runner.cleanup()
+
+
+def energy(series) -> np.ndarray:
+    return series.energy.values
+
+
+def test_one_request_for_all_planes(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "batch", LATITUDE, LONGITUDE, PLANES, url=base)
+            assert await source.async_update(NOW)
+            assert standin.requests == 1
+            query = standin.queries[0]
+            # Jeder Standort einmal, in der Reihenfolge des ersten Auftretens
+            assert query["latitude"] == "52.5200,48.1400"
+            assert query["longitude"] == "13.4100,11.5800"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("time_zone", ["Asia/Tokyo", "Pacific/Kiritimati", "America/Los_Angeles"])
+def test_series_cover_the_local_days(tmp_path, time_zone):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "cover", LATITUDE, LONGITUDE, PLANES, url=base)
+            await source.async_update(NOW)
+            assert standin.queries[0]["past_days"] == "1"
+            return source.series
+
+    series = asyncio.run(scenario())
+    calendar = CalendarIndex.for_timestamp(ZoneInfo(time_zone), NOW)
+    # Auch östlich von UTC beginnt die Reihe vor Mitternacht lokal (Vortag)
+    assert not uncovered_inputs(series, calendar)
+    for row in series:
+        assert row.energy.starts[0] <= calendar.day_starts[0]
+
+
+def test_rows_are_split_per_plane(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "split", LATITUDE, LONGITUDE, PLANES, url=base)
+            await source.async_update(NOW)
+            return source.series
+
+    series = asyncio.run(scenario())
+    assert len(series) == len(PLANES)
+    south, double, east, remote = (energy(row) for row in series)
+    assert south.sum() > 0
+    # Gleiche Fläche, doppelte kWp => doppelte Energie
+    np.testing.assert_allclose(double, 2 * south)
+    # Andere Ausrichtung bzw. anderer Standort => eigene Zeile
+    assert not np.allclose(east, south)
+    assert not np.allclose(remote, south)
+
+
+def test_fresh_cache_and_restart_need_no_request(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "restart", LATITUDE, LONGITUDE, PLANES, url=base)
+            await source.async_update(NOW)
+            assert not await source.async_update(NOW + 60)
+            await source.cache._store.async_save(source.cache._entries)
+
+            restarted = OpenMeteoSource(hass, "restart", LATITUDE, LONGITUDE, PLANES, url=base)
+            assert await restarted.async_update(NOW + 120)
+            assert standin.requests == 1
+            for before, after in zip(source.series, restarted.series):
+                np.testing.assert_array_equal(energy(before), energy(after))
+
+    asyncio.run(scenario())
+
+
+def test_expired_cache_is_revalidated_with_304(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "expired", LATITUDE, LONGITUDE, PLANES, url=base)
+            await source.async_update(NOW)
+            series = list(source.series)
+            # Unverändert auf dem Server => 304, keine neuen Reihen
+            assert not await source.async_update(NOW + CACHE_MAX_AGE)
+            assert (standin.requests, standin.not_modified) == (2, 1)
+            assert all(old is new for old, new in zip(series, source.series))
+
+    asyncio.run(scenario())
+
+
+
+def test_overlapping_updates_share_one_request(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "overlap", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            # Prüfung und Rechendurchlauf gleichzeitig => der zweite Aufruf trifft den Cache
+            changed = await asyncio.gather(source.async_update(NOW), source.async_update(NOW))
+            assert changed == [True, False]
+            assert (standin.requests, standin.meta_requests) == (1, 1)
+
+    asyncio.run(scenario())
+
+# ------------------------------------------------------------------------------
+# Modelllauf (meta.json)
+# ------------------------------------------------------------------------------
+def test_unchanged_run_needs_no_forecast_request(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "run", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            assert await source.async_update(NOW)
+            assert (standin.requests, standin.meta_requests) == (1, 1)
+            # Vor dem nächsten erwarteten Lauf weder meta.json noch Forecast
+            assert not await source.async_update(NOW + CACHE_MAX_AGE)
+            assert (standin.requests, standin.meta_requests) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_new_run_is_fetched_at_next_check(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "new-run", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            await source.async_update(NOW)
+            first = source.model_run
+            check = source.next_check(NOW)
+            standin.clock = lambda: check
+            assert await source.async_update(check)
+            assert source.model_run.initialisation == first.initialisation + standin.run_interval
+            assert (standin.requests, standin.meta_requests) == (2, 2)
+
+    asyncio.run(scenario())
+
+
+def test_late_run_is_retried(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "late", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            await source.async_update(NOW)
+            check = source.next_check(NOW)
+            # Lauf verspätet: die Uhr des Ersatz-Servers bleibt stehen => meta.json meldet den alten Lauf
+            assert not await source.async_update(check)
+            assert (standin.requests, standin.meta_requests) == (1, 2)
+            assert source.next_check(check) == check + RUN_RETRY
+
+    asyncio.run(scenario())
+
+
+def test_next_check(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            best_match = OpenMeteoSource(hass, "best", LATITUDE, LONGITUDE, PLANES, url=base)
+            await best_match.async_update(NOW)
+            icon_d2 = OpenMeteoSource(hass, "icon", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            await icon_d2.async_update(NOW)
+            return best_match, icon_d2, standin.run() + standin.run_interval + standin.run_delay
+
+    best_match, icon_d2, next_run = asyncio.run(scenario())
+    # Ohne Laufinfo nach Ablauf des Caches
+    assert best_match.next_check(NOW) == NOW + CACHE_MAX_AGE
+    # Mit Laufinfo kurz nach dem nächsten Lauf
+    assert icon_d2.next_check(NOW) == icon_d2.model_run.next_expected()
+    assert next_run < icon_d2.next_check(NOW) <= next_run + CACHE_MAX_AGE
+
+
+def test_unchanged_run_schedules_no_recompute(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            # Uhr des Ersatz-Servers = Systemzeit (der Coordinator prüft mit time.time())
+            standin.clock = time.time
+            entry = SimpleNamespace(entry_id="coordinator", data={CONF_DIRECT_SOURCE: True, CONF_PLANES: []},
+                                    options={})
+            coord = coordinator.SfdbCoordinator(hass, entry)
+            coord.source = OpenMeteoSource(hass, "coordinator", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            scheduled = []
+            coord._refresh_scheduler = SimpleNamespace(async_schedule=lambda: scheduled.append(True))
+            await coord._async_check_source()
+            await coord._async_check_source()
+            assert (len(scheduled), standin.requests) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_failed_new_run_keeps_last_run(tmp_path):
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            source = OpenMeteoSource(hass, "fallback", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            await source.async_update(NOW)
+            first, series = source.model_run, list(source.series)
+            # meta.json meldet einen neuen Lauf, der Forecast-Request scheitert (429)
+            check = source.next_check(NOW)
+            standin.clock = lambda: check
+            standin.forecast_status = 429
+            assert not await source.async_update(check)
+            assert source.model_run == first
+            assert all(old is new for old, new in zip(series, source.series))
+            # Alter Lauf bleibt im Cache, nächster Versuch nach RUN_RETRY
+            assert source.cache.get(source._keys[0])["body"] is source._bodies[0]
+            assert source.next_check(check) == check + RUN_RETRY
+            standin.forecast_status = None
+            assert await source.async_update(check + RUN_RETRY)
+            assert source.model_run.initialisation == first.initialisation + standin.run_interval
+
+    asyncio.run(scenario())
+
+
+def test_failed_new_run_keeps_sensors_available(tmp_path, monkeypatch):
+    clock = {"now": NOW}
+    monkeypatch.setattr(openmeteo, "time", SimpleNamespace(time=lambda: clock["now"]))
+
+    async def scenario():
+        async with stand_in(str(tmp_path)) as (standin, hass, base):
+            standin.clock = lambda: clock["now"]
+            entry = SimpleNamespace(entry_id="fallback", data={CONF_DIRECT_SOURCE: True, CONF_PLANES: []},
+                                    options={})
+            coord = coordinator.SfdbCoordinator(hass, entry)
+            coord.source = OpenMeteoSource(hass, "fallback", LATITUDE, LONGITUDE, PLANES, "icon_d2", url=base)
+            await coord.async_refresh()
+            # Neuer Lauf, Forecast-Request scheitert => kein UpdateFailed, Sensoren bleiben verfügbar
+            clock["now"] = coord.source.next_check(NOW)
+            standin.forecast_status = 503
+            await coord.async_refresh()
+            assert coord.last_update_success and standin.requests == 2
+            assert coord.data["sfdb_energy_production_today_remaining_sum_dif"] is not None
+
+    asyncio.run(scenario())
@@ -0,0 +1,130 @@
+"""
+Persistenz (persist.py) und Wiederherstellen im Coordinator: Speichern und
+Laden ergeben denselben Stand, der Stand wird bis zu RESTORE_GRACE Sekunden
+gehalten, solange die Upstream-Sensoren fehlen.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf import coordinator
+from graph_for_omsf.persist import ModelStore
+
+from baseline_cases import PEAK_SENSOR, case_now, case_states
+
+TIME_ZONE = "Europe/Berlin"
+ENTRY = SimpleNamespace(entry_id="persist", data={"peaktime_sensors": [PEAK_SENSOR]}, options={})
+TODAY = "sfdb_energy_production_today_sum"
+
+
+def _public(values: dict) -> dict:
+    """Ausgangswerte wie nach JSON (Tupel => Listen), ohne Zwischenwerte."""
+    return json.loads(json.dumps({key: val for key, val in values.items() if not key.startswith("_")}))
+
+
+async def _computed(config_dir: str, states: dict) -> dict:
+    """Ein Durchlauf mit 'states', gespeichert wie beim Herunterfahren."""
+    hass = HomeAssistant(config_dir)
+    hass.config.set_time_zone(TIME_ZONE)
+    for entity_id, state in states.items():
+        hass.states.async_set(entity_id, state)
+    coord = coordinator.SfdbCoordinator(hass, ENTRY)
+    await coord.async_refresh()
+    store = coord._store
+    await store._store.async_save(store._data_to_save())
+    await hass.async_stop(force=True)
+    return coord.data
+
+
+async def _restarted(config_dir: str):
+    """Neue Instanz ohne Upstream-States => (hass, Coordinator, async_restore())."""
+    hass = HomeAssistant(config_dir)
+    hass.config.set_time_zone(TIME_ZONE)
+    coord = coordinator.SfdbCoordinator(hass, ENTRY)
+    return hass, coord, await coord.async_restore()
+
+
+def test_round_trip(tmp_path, monkeypatch):
+    now = case_now(3, TIME_ZONE)
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: now)
+
+    async def scenario():
+        data = await _computed(str(tmp_path), case_states(3, now, TIME_ZONE))
+        hass, coord, restored = await _restarted(str(tmp_path))
+        stored = await ModelStore(hass, ENTRY.entry_id).async_load()
+        await hass.async_stop(force=True)
+        return data, stored, coord, restored
+
+    data, stored, coord, restored = asyncio.run(scenario())
+    assert stored["computed_at"] == now
+    assert restored
+    assert _public(coord.data) == _public(data)
+    assert coord._restore_hold_until == now + coordinator.RESTORE_GRACE
+
+
+def test_no_restore_from_another_day(tmp_path, monkeypatch):
+    now = case_now(3, TIME_ZONE)
+    clock = {"now": now}
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: clock["now"])
+
+    async def scenario():
+        await _computed(str(tmp_path), case_states(3, now, TIME_ZONE))
+        clock["now"] = now + 86400
+        hass, coord, restored = await _restarted(str(tmp_path))
+        await hass.async_stop(force=True)
+        return coord, restored
+
+    coord, restored = asyncio.run(scenario())
+    assert not restored and coord.data is None
+
+
+def test_restored_state_is_held_until_grace(tmp_path, monkeypatch):
+    now = case_now(3, TIME_ZONE)
+    clock = {"now": now}
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: clock["now"])
+
+    async def scenario():
+        data = await _computed(str(tmp_path), case_states(3, now, TIME_ZONE))
+        hass, coord, _restored = await _restarted(str(tmp_path))
+        held = []
+        # Ohne Upstream-Sensoren: Stand halten, nur die uhrzeitabhängigen Werte laufen mit
+        for offset in (10, coordinator.RESTORE_GRACE - 1):
+            clock["now"] = now + offset
+            await coord.async_refresh()
+            held.append(dict(coord.data))
+        # Nach RESTORE_GRACE wird mit den (fehlenden) Upstream-Werten gerechnet
+        clock["now"] = now + coordinator.RESTORE_GRACE
+        await coord.async_refresh()
+        await hass.async_stop(force=True)
+        return data, held, coord
+
+    data, held, coord = asyncio.run(scenario())
+    assert data[TODAY] > 0
+    for values in held:
+        assert values[TODAY] == data[TODAY]
+    assert coord._restore_hold_until is None
+    assert coord.data[TODAY] == 0
+
+
+def test_upstream_ends_hold(tmp_path, monkeypatch):
+    now = case_now(3, TIME_ZONE)
+    states = case_states(3, now, TIME_ZONE)
+    monkeypatch.setattr(coordinator, "now_timestamp", lambda: now + 10)
+
+    async def scenario():
+        data = await _computed(str(tmp_path), states)
+        hass, coord, _restored = await _restarted(str(tmp_path))
+        changed = {**states, "sensor.energy_production_today_6": "42.0"}
+        for entity_id, state in changed.items():
+            hass.states.async_set(entity_id, state)
+        await coord.async_refresh()
+        await hass.async_stop(force=True)
+        return data, coord
+
+    data, coord = asyncio.run(scenario())
+    # Tages-Sensor mit Wert => sofort neu gerechnet, nicht erst nach RESTORE_GRACE
+    assert coord._restore_hold_until is None
+    fresh = coordinator.compute_model(coord._inputs)
+    assert coord.data[TODAY] == fresh[TODAY] != data[TODAY]
@@ -0,0 +1,141 @@
+"""
+Stundenreihen aus den Attributen der Tages-Sensoren (series.py).
+"""
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from graph_for_omsf.clock import CalendarIndex
+from graph_for_omsf.model import CLOCK_STEP
+from graph_for_omsf.series import EMPTY, StringSeries, derive_inputs, parse_day, parse_series, uncovered_inputs
+
+BERLIN = ZoneInfo("Europe/Berlin")
+DAY = date(2026, 6, 10)
+CALENDAR = CalendarIndex(BERLIN, DAY)
+
+
+def _day(offset: int, wh: float = 1000.0, peak_hour: int = 13) -> tuple:
+    """Attribute eines Tages-Sensors: 'wh' je Stunde, höchste Leistung um 'peak_hour'."""
+    start = datetime.combine(DAY + timedelta(days=offset), datetime.min.time(), tzinfo=BERLIN)
+    hours = [start + timedelta(hours=hour) for hour in range(24)]
+    return parse_day({
+        "wh_period": {when.isoformat(): wh for when in hours},
+        "watts": {when: (2000 if when.hour == peak_hour else 500) for when in hours},
+    })
+
+
+def _string(wh: float = 1000.0, days: range = range(4)) -> StringSeries:
+    return StringSeries([_day(offset, wh) for offset in days])
+
+
+def _at(offset: int, hour: int) -> float:
+    return datetime.combine(DAY + timedelta(days=offset), datetime.min.time(), tzinfo=BERLIN).timestamp() + hour * 3600
+
+
+# ------------------------------------------------------------------------------
+# Parsen
+# ------------------------------------------------------------------------------
+def test_parse_series_datetime_and_iso_keys():
+    first = datetime(2026, 6, 10, 8, tzinfo=BERLIN)
+    second = first + timedelta(hours=1)
+    # Gemischte Schlüssel, unsortiert => sortiert nach Zeitpunkt
+    series = parse_series({"wh_period": {second.isoformat(): "200", first: 100}}, "wh_period")
+    assert series.starts.tolist() == [first.timestamp(), second.timestamp()]
+    assert series.values.tolist() == [100.0, 200.0]
+
+
+def test_parse_series_drops_invalid_entries():
+    when = datetime(2026, 6, 10, 8, tzinfo=BERLIN)
+    raw = {"garbage": 1, when: "unknown", when + timedelta(hours=1): None, when + timedelta(hours=2): 5}
+    series = parse_series({"watts": raw}, "watts")
+    assert series.starts.tolist() == [(when + timedelta(hours=2)).timestamp()]
+    assert series.values.tolist() == [5.0]
+    for attributes in (None, {}, {"watts": {}}, {"watts": {"garbage": 1}}, {"other": {when: 1}}):
+        assert parse_series(attributes, "watts") is EMPTY
+
+
+# ------------------------------------------------------------------------------
+# Abfragen auf der Reihe
+# ------------------------------------------------------------------------------
+def test_energy_between():
+    string = _string(wh=500.0)
+    # Stunden mit Beginn in [start, end), in kWh
+    assert string.energy_between(_at(0, 8), _at(0, 10)) == 1.0
+    assert string.energy_between(_at(0, 8), _at(0, 8) + 1) == 0.5
+    assert string.energy_between(_at(0, 8) + 1, _at(0, 9)) == 0.0
+    assert string.energy_between(_at(0, 0), _at(4, 0)) == 48.0
+    assert string.energy_between(_at(-1, 0), _at(0, 0)) == 0.0
+    assert StringSeries([(EMPTY, EMPTY)]).energy_between(_at(0, 0), _at(1, 0)) == 0.0
+
+
+def test_peak_time():
+    string = StringSeries([_day(0, peak_hour=13), _day(1, peak_hour=11)])
+    assert string.peak_time(_at(0, 0), _at(1, 0)) == _at(0, 13)
+    assert string.peak_time(_at(1, 0), _at(2, 0)) == _at(1, 11)
+    # Über beide Tage: gleich hohe Peaks => der erste
+    assert string.peak_time(_at(0, 0), _at(2, 0)) == _at(0, 13)
+    # Kein Wert im Zeitraum
+    assert string.peak_time(_at(2, 0), _at(3, 0)) is None
+    assert string.peak_time(_at(0, 13), _at(0, 13)) is None
+
+
+# ------------------------------------------------------------------------------
+# Kennzahlen
+# ------------------------------------------------------------------------------
+def test_derive_inputs():
+    strings = [_string(1000.0), StringSeries([_day(offset, 500.0, peak_hour=12) for offset in range(4)])]
+    inputs = derive_inputs(strings, CALENDAR, _at(0, 10), CLOCK_STEP)
+    assert inputs["current_hour"] == inputs["next_hour"] == [1.0, 0.5]
+    # Volle Stunde => laufende Stunde ganz + 11:00..23:00
+    assert inputs["today_remaining"] == [14.0, 7.0]
+    assert inputs["remaining_dif"] == [(14.0, 1.0), (7.0, 0.5)]
+    for metric in ("today", "tomorrow", "d2", "d3"):
+        assert inputs[metric] == [24.0, 12.0]
+    assert inputs["peak_today"] == [_at(0, 13), _at(0, 12)]
+    assert inputs["peak_tomorrow"] == [_at(1, 13), _at(1, 12)]
+
+
+def test_derive_inputs_on_short_day():
+    # 29.03.2026: 23 Stunden, die Reihe hat 23 Einträge (02:00 fehlt)
+    spring = date(2026, 3, 29)
+    start = datetime(2026, 3, 29, tzinfo=BERLIN).timestamp()
+    wh = {datetime.fromtimestamp(start + hour * 3600, BERLIN): 1000 for hour in range(23)}
+    string = StringSeries([parse_day({"wh_period": wh, "watts": wh})])
+    inputs = derive_inputs([string], CalendarIndex(BERLIN, spring), start + 3600, CLOCK_STEP)
+    assert inputs["today"] == [23.0]
+    assert inputs["tomorrow"] == [0.0]
+    # 01:00..23:00 (ohne die ausgefallene Stunde) => 22 Stunden
+    assert inputs["today_remaining"] == [22.0]
+
+
+def test_uncovered_inputs():
+    assert uncovered_inputs([_string(), _string()], CALENDAR) == frozenset()
+    # Ein String ohne d3
+    assert uncovered_inputs([_string(), _string(days=range(3))], CALENDAR) == {"d3"}
+    # Ohne heute (Reihe ab morgen) => auch der Peak von heute
+    assert uncovered_inputs([_string(days=range(1, 4))], CALENDAR) == {"today", "peak_today"}
+    assert uncovered_inputs([StringSeries([(EMPTY, EMPTY)])], CALENDAR) == {
+        "today", "tomorrow", "d2", "d3", "peak_today", "peak_tomorrow"}
+
+
+def test_remaining_is_quantized_to_the_clock_step():
+    hour = datetime(2026, 6, 10, 21, tzinfo=BERLIN).timestamp()
+    values = [derive_inputs([_string()], CALENDAR, hour + offset, CLOCK_STEP)["today_remaining"][0]
+              for offset in (360, 500, 719)]
+    # 21:06..21:11:59 => 0.9 der laufenden Stunde + 22:00 und 23:00
+    assert values == [pytest.approx(0.9 + 2.0)] * 3
+    later = derive_inputs([_string()], CALENDAR, hour + 720, CLOCK_STEP)["today_remaining"][0]
+    assert later == pytest.approx(0.8 + 2.0)
+
+
+def test_covers_needs_the_whole_day():
+    day = CALENDAR.day_starts
+    # Reihe erst ab 09:00 lokal (z.B. UTC-Achse östlich von UTC) => heute nicht abgedeckt
+    string = _string()
+    partial = StringSeries([(string.energy._replace(starts=string.energy.starts[9:],
+                                                    values=string.energy.values[9:]), string.power)])
+    assert string.covers(day[0], day[1])
+    assert not partial.covers(day[0], day[1])
+    assert partial.covers(day[1], day[2])
+    assert not string.covers(day[0], day[-1] + 3600)
@@ -0,0 +1,93 @@
+"""
+Sonnenstand und Einstrahlung auf die Modulebene (transposition.py) gegen
+Referenzwerte: Sonnenhöchststand zu den Sonnenwenden, Tag-und-Nacht-Gleiche
+am Äquator und Hay-Davies von Hand gerechnet.
+"""
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from graph_for_omsf.transposition import ALBEDO, extraterrestrial, plane_power, solar_position
+
+# Sommersonnenwende 2026: Deklination +23.436°. Greenwich (51.4769 N, 0 E),
+# wahrer Mittag 12:01:36 UTC (Zeitgleichung -1.6 min) => Zenit 51.4769 - 23.436 = 28.041°
+SOLSTICE_NOON = datetime(2026, 6, 21, 12, 1, 36, tzinfo=timezone.utc).timestamp()
+GREENWICH = (51.4769, 0.0)
+SOLSTICE_ZENITH = 51.4769 - 23.436
+
+
+def _degrees(cos_zenith, azimuth) -> tuple:
+    return math.degrees(math.acos(cos_zenith[0, 0])), math.degrees(azimuth[0, 0])
+
+
+def test_sun_at_summer_solstice_noon():
+    zenith, azimuth = _degrees(*solar_position([SOLSTICE_NOON], [GREENWICH[0]], [GREENWICH[1]]))
+    assert zenith == pytest.approx(SOLSTICE_ZENITH, abs=0.1)
+    assert azimuth == pytest.approx(0.0, abs=0.5)
+
+
+def test_sun_at_winter_solstice_noon():
+    # Berlin, wahrer Mittag 11:04:40 UTC => Höhe 90 - 52.52 - 23.436 = 14.044°
+    noon = datetime(2026, 12, 21, 11, 4, 40, tzinfo=timezone.utc).timestamp()
+    zenith, azimuth = _degrees(*solar_position([noon], [52.52], [13.41]))
+    assert 90.0 - zenith == pytest.approx(90.0 - 52.52 - 23.436, abs=0.1)
+    assert azimuth == pytest.approx(0.0, abs=0.5)
+
+
+def test_sunrise_at_equinox_on_equator():
+    # 20.03.2026, Äquator, 0 E: Aufgang 06:07:30 UTC (Zeitgleichung -7.5 min) genau im Osten
+    sunrise = datetime(2026, 3, 20, 6, 7, 30, tzinfo=timezone.utc).timestamp()
+    zenith, azimuth = _degrees(*solar_position([sunrise], [0.0], [0.0]))
+    assert zenith == pytest.approx(90.0, abs=0.25)
+    assert azimuth == pytest.approx(-90.0, abs=0.5)
+
+
+def test_positions_are_per_location():
+    cos_zenith, azimuth = solar_position([SOLSTICE_NOON, SOLSTICE_NOON + 3600],
+                                         [GREENWICH[0], 0.0, -33.9], [0.0, 0.0, 18.4])
+    assert cos_zenith.shape == azimuth.shape == (3, 2)
+    # Nachmittags steht die Sonne im Westen (positiv)
+    assert azimuth[0, 1] > 0
+
+
+def test_poa_hay_davies_reference():
+    # Von Hand: Fläche 30° Süd zum Mittag der Sommersonnenwende, DNI 800, DHI 100
+    zenith, tilt = math.radians(SOLSTICE_ZENITH), math.radians(30)
+    dni, dhi = 800.0, 100.0
+    ghi = dni * math.cos(zenith) + dhi
+    cos_incidence = math.cos(zenith - tilt)
+    anisotropy = dni / (1367.0 * (1 + 0.033 * math.cos(2 * math.pi * 172 / 365)))
+    expected = (dni * cos_incidence
+                + dhi * (anisotropy * cos_incidence / math.cos(zenith) + (1 - anisotropy) * (1 + math.cos(tilt)) / 2)
+                + ghi * ALBEDO * (1 - math.cos(tilt)) / 2)
+    assert expected == pytest.approx(915.7, abs=0.1)
+    power = plane_power([SOLSTICE_NOON], [GREENWICH[0]], [GREENWICH[1]], [[ghi]], [[dni]], [[dhi]],
+                        [0], [30], [0], [1.0], 1.0)
+    assert power[0, 0] == pytest.approx(expected, rel=1e-3)
+
+
+def test_horizontal_plane_gets_ghi():
+    # Waagrecht: Beam * cos(Zenit) + Diffus = GHI, für jeden Sonnenstand über ~5°
+    times = SOLSTICE_NOON + np.arange(-6, 7) * 3600.0
+    cos_zenith, _azimuth = solar_position(times, [GREENWICH[0]], [GREENWICH[1]])
+    dni = np.full((1, len(times)), 600.0)
+    dhi = np.full((1, len(times)), 150.0)
+    ghi = dni * cos_zenith + dhi
+    power = plane_power(times, [GREENWICH[0]], [GREENWICH[1]], ghi, dni, dhi, [0], [0], [0], [1.0], 1.0)
+    np.testing.assert_allclose(power, ghi, rtol=1e-9)
+
+
+def test_power_scaling_and_night():
+    midnight = datetime(2026, 6, 21, 0, tzinfo=timezone.utc).timestamp()
+    times = [SOLSTICE_NOON, midnight]
+    diffuse = [[0.0, 0.0]]
+    power = plane_power(times, [GREENWICH[0]], [GREENWICH[1]], diffuse, [[500.0, 500.0]], diffuse,
+                        [0, 0], [30, 30], [0, 0], [1.0, 5.0], 0.85)
+    # kWp bei 1000 W/m² => Leistung proportional zu kWp und Verlustfaktor
+    np.testing.assert_allclose(power[1], 5.0 * power[0])
+    assert power[0, 0] == pytest.approx(500.0 * math.cos(math.radians(30 - SOLSTICE_ZENITH)) * 0.85, rel=1e-3)
+    # Sonne unter dem Horizont => kein Beam
+    assert power[0, 1] == power[1, 1] == 0.0
+    assert extraterrestrial([SOLSTICE_NOON])[0] == pytest.approx(1322.8, abs=1.0)
@@ -0,0 +1,63 @@
+"""
+Index der Upstream-Entities (upstream.py): bisherige Verdrahtung und konfigurierte Strings.
+"""
+import pytest
+
+from graph_for_omsf.const import DEFAULT_STRINGS
+from graph_for_omsf.upstream import (
+    FIXED_ENTITIES,
+    UpstreamIndex,
+    format_string_suffixes,
+    parse_string_suffixes,
+)
+
+
+@pytest.mark.parametrize("strings", [None, DEFAULT_STRINGS], ids=["none", "default"])
+def test_legacy_suffixes_per_metric(strings):
+    index = UpstreamIndex(strings)
+    metrics = index.metrics
+    assert index.string_count == 5
+    assert metrics["today"][0] == "sensor.energy_production_today_6"
+    assert metrics["current_hour"][-1] == "sensor.energy_current_hour_10"
+    assert metrics["d2"] == ("sensor.energy_production_d2", "sensor.energy_production_d2_2",
+                             "sensor.energy_production_d2_3", "sensor.energy_production_d2_4",
+                             "sensor.energy_production_d2_5")
+    assert metrics["d3"][0] == "sensor.energy_production_d3"
+    assert len(metrics["peak_tomorrow"]) == 8
+    assert metrics["peak_tomorrow"][-1] == "sensor.power_highest_peak_time_tomorrow_24"
+    assert index.remaining_dif[0] == ("sensor.energy_production_today_remaining_1", "sensor.energy_next_hour_1")
+    assert len(index.remaining_dif) == 11
+    # Stundenreihen je String: die Tages-Sensoren mit dem Suffix ihrer Kennzahl
+    assert index.series[1] == ("sensor.energy_production_today_7", "sensor.energy_production_tomorrow_7",
+                               "sensor.energy_production_d2_2", "sensor.energy_production_d3_2")
+
+
+def test_configured_strings():
+    index = UpstreamIndex(["", "_2", "_9"])
+    assert index.string_count == 3
+    for metric, ents in index.metrics.items():
+        assert len(ents) == 3
+        assert ents[2].endswith("_9")
+    assert index.metrics["d2"][0] == "sensor.energy_production_d2"
+    assert index.remaining_dif[1] == ("sensor.energy_production_today_remaining_2", "sensor.energy_next_hour_2")
+    assert index.series[2] == ("sensor.energy_production_today_9", "sensor.energy_production_tomorrow_9",
+                               "sensor.energy_production_d2_9", "sensor.energy_production_d3_9")
+
+
+def test_entity_ids():
+    index = UpstreamIndex(["", "_2"])
+    single = index.entity_ids()
+    assert set(FIXED_ENTITIES) <= single
+    assert "sensor.power_highest_peak_time_tomorrow_2" in single
+    assert "sensor.energy_next_hour" in single
+    series = index.entity_ids(series=True)
+    # Nur die Tages-Sensoren der Stundenreihen (plus die fest verdrahteten)
+    assert series - set(FIXED_ENTITIES) == {ent for ents in index.series for ent in ents}
+    assert len(series - set(FIXED_ENTITIES)) == 8
+
+
+def test_parse_and_format_suffixes():
+    assert parse_string_suffixes("ohne, _2 ,,_3") == ["", "_2", "_3"]
+    assert parse_string_suffixes("OHNE") == [""]
+    assert parse_string_suffixes("") == []
+    assert format_string_suffixes(["", "_2"]) == "ohne,_2"
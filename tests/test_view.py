@@ -0,0 +1,116 @@
+"""
+HTTP-View (view.py) über einen lokalen aiohttp-Server: Authentifizierung,
+ETag / If-None-Match => 304, neue Daten => neuer ETag.
+"""
+import asyncio
+import contextlib
+import json
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from aiohttp import web
+from homeassistant.components.http.const import KEY_AUTHENTICATED, KEY_HASS
+from homeassistant.core import HomeAssistant
+
+from graph_for_omsf.const import DOMAIN
+from graph_for_omsf.view import SfdbForecastView
+
+# Die View liest hass wie HA über den String-Schlüssel der App
+pytestmark = pytest.mark.filterwarnings("ignore::aiohttp.web.NotAppKeyWarning")
+
+TOKEN = "Bearer test"
+DATA = {
+    "_curve": {"timestamps": [1780000000, 1780003600], "values": [1.5, 2.5]},
+    "sfdb_energy_production_today_sum": 12.3,
+}
+
+
+@web.middleware
+async def _auth(request: web.Request, handler):
+    """Ersatz für die Auth-Middleware von HA: authentifiziert ist nur TOKEN."""
+    request[KEY_AUTHENTICATED] = request.headers.get("Authorization") == TOKEN
+    return await handler(request)
+
+
+@contextlib.asynccontextmanager
+async def view_server(config_dir: str):
+    """View registriert wie in HA, Coordinator 'entry' mit DATA => (Coordinator, Basis-URL, Session)."""
+    hass = HomeAssistant(config_dir)
+    coordinator = SimpleNamespace(data=DATA)
+    hass.data[DOMAIN] = {"entry": coordinator}
+    app = web.Application(middlewares=[_auth])
+    app[KEY_HASS] = hass
+    SfdbForecastView().register(hass, app, app.router)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{runner.addresses[0][1]}/api/graph_for_omsf/forecast"
+    try:
+        async with aiohttp.ClientSession(headers={"Authorization": TOKEN}) as session:
+            yield coordinator, base, session
+    finally:
+        await runner.cleanup()
+        await hass.async_stop(force=True)
+
+
+def test_requires_auth(tmp_path):
+    async def scenario():
+        async with view_server(str(tmp_path)) as (_coordinator, base, session):
+            async with session.get(f"{base}/entry", headers={"Authorization": "Bearer wrong"}) as resp:
+                assert resp.status == 401
+            async with session.get(f"{base}/entry") as resp:
+                assert resp.status == 200
+            async with session.get(f"{base}/missing") as resp:
+                assert resp.status == 404
+
+    assert SfdbForecastView.requires_auth
+    asyncio.run(scenario())
+
+
+def test_payload(tmp_path):
+    async def scenario():
+        async with view_server(str(tmp_path)) as (_coordinator, base, session):
+            async with session.get(f"{base}/entry") as resp:
+                assert resp.headers["Cache-Control"] == "no-cache"
+                return json.loads(await resp.read())
+
+    payload = asyncio.run(scenario())
+    assert payload["timestamps"] == DATA["_curve"]["timestamps"]
+    assert payload["values"] == DATA["_curve"]["values"]
+    assert payload["production"] == {"today": 12.3, "tomorrow": None, "d2": None, "d3": None}
+    assert payload["hours"][:2] == [0, 1]
+
+
+def test_matching_etag_gives_304(tmp_path):
+    async def scenario():
+        async with view_server(str(tmp_path)) as (_coordinator, base, session):
+            async with session.get(f"{base}/entry") as resp:
+                etag = resp.headers["ETag"]
+            for if_none_match in (etag, f'"other", W/{etag}', "*"):
+                async with session.get(f"{base}/entry", headers={"If-None-Match": if_none_match}) as resp:
+                    assert resp.status == 304
+                    assert resp.headers["ETag"] == etag
+                    assert await resp.read() == b""
+
+    asyncio.run(scenario())
+
+
+def test_other_etag_gives_body(tmp_path):
+    async def scenario():
+        async with view_server(str(tmp_path)) as (coordinator, base, session):
+            async with session.get(f"{base}/entry") as resp:
+                etag = resp.headers["ETag"]
+            async with session.get(f"{base}/entry", headers={"If-None-Match": '"other"'}) as resp:
+                assert resp.status == 200
+                assert resp.headers["ETag"] == etag
+                assert await resp.read()
+            # Neuer Durchlauf => neues Daten-Objekt, neuer ETag, alter ETag liefert wieder den Body
+            coordinator.data = {**DATA, "sfdb_energy_production_today_sum": 13.0}
+            async with session.get(f"{base}/entry", headers={"If-None-Match": etag}) as resp:
+                assert resp.status == 200
+                assert resp.headers["ETag"] != etag
+                assert json.loads(await resp.read())["production"]["today"] == 13.0
+
+    asyncio.run(scenario())
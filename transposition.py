@@ -0,0 +1,84 @@
+"""
+Vektorisierte Umrechnung Einstrahlung => Leistung je String (NumPy).
+
+Aus den stündlichen Werten GHI / DNI / DHI (W/m², je Standort) und den
+Modulflächen (Neigung, Azimut, kWp, Standort-Index) wird die Einstrahlung
+auf die Modulebene (POA, Hay-Davies) und daraus die Leistung für alle
+Strings x Stunden in einem Durchgang berechnet.
+
+Azimut wie Open-Meteo: 0 = Süd, -90 = Ost, 90 = West.
+"""
+import numpy as np
+
+SOLAR_CONSTANT = 1367.0
+# Bodenreflexion (Albedo) pauschal
+ALBEDO = 0.2
+# Untergrenze für cos(Zenit) beim Beam-Verhältnis (Sonne sehr tief, ~85°)
+MIN_COS_ZENITH = 0.087
+
+
+def solar_position(times: np.ndarray, latitude: np.ndarray, longitude: np.ndarray) -> tuple:
+    """
+    Sonnenstand (NOAA-Näherung) für Unix-Zeiten 'times' (H) an den Standorten
+    'latitude' / 'longitude' (L, Grad) => (cos_zenith, azimuth) je (L x H),
+    azimuth in Radiant (0 = Süd, positiv nach Westen).
+    """
+    times = np.asarray(times, dtype=float)[np.newaxis, :]
+    phi = np.radians(np.asarray(latitude, dtype=float))[:, np.newaxis]
+    lon = np.asarray(longitude, dtype=float)[:, np.newaxis]
+
+    days = times / 86400.0
+    # Tageswinkel ab 1. Januar (Unix-Epoche => Jahreslänge 365.2425 Tage)
+    gamma = 2.0 * np.pi * ((days + 0.5) % 365.2425) / 365.2425
+    eqtime = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                       - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    decl = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+            - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+            - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+
+    # Wahre Sonnenzeit (Minuten) => Stundenwinkel
+    solar_minutes = (times % 86400.0) / 60.0 + eqtime + 4.0 * lon
+    hour_angle = np.radians(solar_minutes / 4.0 - 180.0)
+
+    cos_zenith = np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(hour_angle)
+    azimuth = np.arctan2(np.sin(hour_angle), np.cos(hour_angle) * np.sin(phi) - np.tan(decl) * np.cos(phi))
+    return cos_zenith, azimuth
+
+
+def extraterrestrial(times: np.ndarray) -> np.ndarray:
+    """Extraterrestrische Normalstrahlung (W/m²) je Zeitpunkt."""
+    days = np.asarray(times, dtype=float) / 86400.0
+    return SOLAR_CONSTANT * (1.0 + 0.033 * np.cos(2.0 * np.pi * (days % 365.2425) / 365.2425))
+
+
+def plane_power(times, latitude, longitude, ghi, dni, dhi, location, tilt, azimuth, kwp, ratio) -> np.ndarray:
+    """
+    Leistung (W) je String x Stunde.
+    times => Zeitpunkte (H) für den Sonnenstand (Stundenmitte),
+    latitude / longitude => Standorte (L), ghi / dni / dhi => (L x H) in W/m²,
+    location / tilt / azimuth / kwp => je String (S), ratio => Verluste pauschal.
+    """
+    location = np.asarray(location, dtype=int)
+    cos_zenith, sun_azimuth = solar_position(times, latitude, longitude)
+    # Standort => String
+    cos_zenith = cos_zenith[location]
+    sun_azimuth = sun_azimuth[location]
+    ghi = np.asarray(ghi, dtype=float)[location]
+    dni = np.asarray(dni, dtype=float)[location]
+    dhi = np.asarray(dhi, dtype=float)[location]
+
+    beta = np.radians(np.asarray(tilt, dtype=float))[:, np.newaxis]
+    plane_azimuth = np.radians(np.asarray(azimuth, dtype=float))[:, np.newaxis]
+    sin_zenith = np.sqrt(np.clip(1.0 - cos_zenith * cos_zenith, 0.0, 1.0))
+    cos_incidence = cos_zenith * np.cos(beta) + sin_zenith * np.sin(beta) * np.cos(sun_azimuth - plane_azimuth)
+    cos_incidence = np.where(cos_zenith > 0.0, np.clip(cos_incidence, 0.0, None), 0.0)
+
+    # Hay-Davies: zirkumsolarer Anteil des Diffuslichts folgt dem Beam
+    anisotropy = np.clip(dni / extraterrestrial(times)[np.newaxis, :], 0.0, 1.0)
+    beam_ratio = cos_incidence / np.maximum(cos_zenith, MIN_COS_ZENITH)
+    poa = (dni * cos_incidence
+           + dhi * (anisotropy * beam_ratio + (1.0 - anisotropy) * (1.0 + np.cos(beta)) / 2.0)
+           + ghi * ALBEDO * (1.0 - np.cos(beta)) / 2.0)
+
+    # kWp gilt bei 1000 W/m² => W = POA * kWp
+    return np.clip(poa, 0.0, None) * (np.asarray(kwp, dtype=float)[:, np.newaxis] * ratio)
@@ -0,0 +1,104 @@
+"""
+Index der Upstream-Entities (Open-Meteo Solar Forecast).
+
+Aus der konfigurierten String-Liste (Suffixe wie "", "_2", "_6") wird beim
+Setup einmalig festgelegt, welche entity_ids pro Kennzahl gelesen werden.
+Im Update-Pfad wird dann nur noch über diese Tupel iteriert.
+"""
+
+# Kennzahl => Prefix der Open-Meteo-Sensoren
+METRIC_PREFIXES = {
+    "current_hour": "sensor.energy_current_hour",
+    "next_hour": "sensor.energy_next_hour",
+    "today_remaining": "sensor.energy_production_today_remaining",
+    "today": "sensor.energy_production_today",
+    "tomorrow": "sensor.energy_production_tomorrow",
+    "d2": "sensor.energy_production_d2",
+    "d3": "sensor.energy_production_d3",
+    "peak_today": "sensor.power_highest_peak_time_today",
+    "peak_tomorrow": "sensor.power_highest_peak_time_tomorrow",
+}
+
+# Tages-Sensoren mit den Stundenreihen als Attribut (wh_period / watts)
+SERIES_METRICS = ("today", "tomorrow", "d2", "d3")
+
+# Einzelne, fest verdrahtete Upstream-Entities
+SUN_NEXT_RISING = "sensor.sun_next_rising"
+SUN_NEXT_SETTING = "sensor.sun_next_setting"
+PROD_REMAIN = "sensor.energy_production_today_remaining_p8"
+FIXED_ENTITIES = (SUN_NEXT_RISING, SUN_NEXT_SETTING, PROD_REMAIN)
+
+# Bisher fest verdrahtete Suffixe (Einträge ohne String-Konfiguration)
+_LEGACY_STRINGS = ["_6", "_7", "_8", "_9", "_10"]
+LEGACY_SUFFIXES = {
+    "current_hour": _LEGACY_STRINGS,
+    "next_hour": _LEGACY_STRINGS,
+    "today_remaining": _LEGACY_STRINGS,
+    "today": _LEGACY_STRINGS,
+    "tomorrow": _LEGACY_STRINGS,
+    "d2": ["", "_2", "_3", "_4", "_5"],
+    "d3": ["", "_2", "_3", "_4", "_5"],
+    "peak_today": _LEGACY_STRINGS,
+    "peak_tomorrow": ["_3", "_6", "_9", "_12", "_15", "_18", "_21", "_24"],
+}
+_LEGACY_REMAINING_DIF = ["_1", "_2", "_3", "_4", "_6", "_9", "_12", "_15", "_18", "_21", "_24"]
+_LEGACY_STRING_COUNT = 5
+
+# Platzhalter für "String ohne Suffix"
+NO_SUFFIX = "ohne"
+
+
+def parse_string_suffixes(text: str) -> list:
+    """'ohne, _2, _3' => ['', '_2', '_3']"""
+    suffixes = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        suffixes.append("" if part.lower() == NO_SUFFIX else part)
+    return suffixes
+
+
+def format_string_suffixes(suffixes: list) -> str:
+    """['', '_2'] => 'ohne,_2'"""
+    return ",".join(suffix or NO_SUFFIX for suffix in suffixes)
+
+
+class UpstreamIndex:
+    """Feste entity_id-Tupel je Kennzahl."""
+
+    def __init__(self, strings=None):
+        if strings is None or list(strings) == _LEGACY_STRINGS:
+            # Ohne Konfiguration bzw. mit den bisherigen Suffixen (Vorgabe im Formular):
+            # d2/d3, Peak morgen und Rest-Differenz haben upstream eigene Suffixe
+            suffixes = LEGACY_SUFFIXES
+            remaining_dif = _LEGACY_REMAINING_DIF
+            self.string_count = _LEGACY_STRING_COUNT
+        else:
+            suffixes = {metric: strings for metric in METRIC_PREFIXES}
+            remaining_dif = strings
+            self.string_count = len(strings)
+
+        self.metrics = {
+            metric: tuple(f"{prefix}{suffix}" for suffix in suffixes[metric])
+            for metric, prefix in METRIC_PREFIXES.items()
+        }
+        self.remaining_dif = tuple(
+            (f"{METRIC_PREFIXES['today_remaining']}{suffix}", f"{METRIC_PREFIXES['next_hour']}{suffix}")
+            for suffix in remaining_dif
+        )
+        # Stundenreihen: je String die vier Tages-Sensoren (heute..d3), je Kennzahl mit ihrem Suffix
+        self.series = tuple(zip(*(self.metrics[metric] for metric in SERIES_METRICS)))
+
+    def entity_ids(self, series: bool = False) -> set:
+        """
+        Alle entity_ids aus dem Index (inkl. der fest verdrahteten).
+        series=True => statt der Einzel-Sensoren nur die Tages-Sensoren der Stundenreihen.
+        """
+        if series:
+            ids = {ent for ents in self.series for ent in ents}
+        else:
+            ids = {ent for ents in self.metrics.values() for ent in ents}
+            ids.update(ent for pair in self.remaining_dif for ent in pair)
+        ids.update(FIXED_ENTITIES)
+        return ids
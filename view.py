@@ -0,0 +1,69 @@
+"""
+HTTP-View: kompletter Forecast-Horizont als ein kompaktes JSON.
+
+GET /api/graph_for_omsf/forecast/{entry_id}
+Antwort ist spaltenweise (timestamps / values / hours + Marker). Mit
+If-None-Match und unveränderten Daten wird nur 304 geliefert.
+"""
+import hashlib
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.helpers.json import json_bytes
+
+from .const import DOMAIN
+from .model import HORIZON_HOURS
+
+
+def _payload(data: dict) -> dict:
+    """Spaltenweises JSON aus dem Modell."""
+    curve = data.get("_curve") or {"timestamps": [], "values": []}
+    return {
+        "timestamps": curve["timestamps"],
+        "values": curve["values"],
+        "hours": [0, 1] + HORIZON_HOURS,
+        "markers": data.get("_markers") or {},
+        "production": {
+            day: data.get(f"sfdb_energy_production_{day}_sum")
+            for day in ("today", "tomorrow", "d2", "d3")
+        },
+    }
+
+
+class SfdbForecastView(HomeAssistantView):
+    """Liefert den aktuellen Forecast eines Config Entries (authentifiziert)."""
+
+    url = "/api/graph_for_omsf/forecast/{entry_id}"
+    name = "api:graph_for_omsf:forecast"
+    requires_auth = True
+
+    def __init__(self):
+        # entry_id => (Modell-Daten, Body, ETag)
+        self._cache = {}
+
+    def _body(self, entry_id: str, data: dict):
+        cached = self._cache.get(entry_id)
+        if cached is not None and cached[0] is data:
+            return cached[1], cached[2]
+        body = json_bytes(_payload(data))
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._cache[entry_id] = (data, body, etag)
+        return body, etag
+
+    async def get(self, request: web.Request, entry_id: str) -> web.Response:
+        hass = request.app["hass"]
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+        if coordinator is None or coordinator.data is None:
+            self._cache.pop(entry_id, None)
+            return self.json_message("Unknown entry", status_code=404)
+
+        body, etag = self._body(entry_id, coordinator.data)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return web.Response(status=304, headers=headers)
+
+        return web.Response(body=body, content_type="application/json", headers=headers)